@@ -1,138 +1,209 @@
 import streamlit as st
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
+import hashlib
 import os
-
-# --- Configuration Data (Embedded) ---
-SERVICES = {
-    "Custom AI Apps": {
-        "description": "Bespoke AI-powered applications tailored to your business needs",
-        "benefits": ["Automate workflows by 70%+", "Scale without headcount", "Competitive advantage", "Seamless integration"],
-        "use_cases": ["Document processing", "Predictive analytics", "Virtual agents", "Workflow automation"],
-        "roi_points": "300-500% ROI within first year"
-    },
-    "PMS/CRM Systems": {
-        "description": "AI-enhanced Project Management and CRM platforms",
-        "benefits": ["Centralize client data", "AI-powered lead scoring", "Automated follow-ups", "Real-time analytics"],
-        "use_cases": ["Sales pipeline management", "Resource allocation", "Customer lifecycle management", "Automated reporting"],
-        "roi_points": "35% sales conversion increase, 60% admin time reduction"
-    },
-    "AI Marketplace": {
-        "description": "Custom marketplace platforms with AI matching and pricing",
-        "benefits": ["AI recommendations", "Intelligent search", "Automated matching", "Dynamic pricing"],
-        "use_cases": ["B2B marketplaces", "E-commerce engines", "Talent platforms", "Resource sharing"],
-        "roi_points": "45% transaction volume increase, 25% platform stickiness boost"
-    },
-    "AI Voice Agents": {
-        "description": "24/7 intelligent voice assistants for customer service and sales",
-        "benefits": ["Unlimited simultaneous calls", "Multi-language support", "Auto lead qualification", "80% cost reduction"],
-        "use_cases": ["Customer support", "Sales calls", "Appointment scheduling", "Order taking"],
-        "roi_points": "$50,000+ annual savings per rep replaced"
-    },
-    "Website & Funnels": {
-        "description": "High-converting websites and sales funnels with AI optimization",
-        "benefits": ["AI personalization", "Real-time A/B testing", "Intelligent chatbots", "CRO through ML"],
-        "use_cases": ["Lead generation pages", "E-commerce funnels", "SaaS onboarding", "Event registration"],
-        "roi_points": "2-3x conversion rate increase within 90 days"
-    },
-    "AI Automations": {
-        "description": "End-to-end business process automation with AI",
-        "benefits": ["Eliminate manual tasks", "Unified workflows", "Intelligent decisions", "Scale without hiring"],
-        "use_cases": ["Data entry automation", "Email automation", "Social media management", "Report generation"],
-        "roi_points": "20-30 hours saved per employee weekly"
-    }
-}
-
-OBJECTIONS = {
-    "Price/Budget": ["It's too expensive", "We don't have the budget", "Your competitors are cheaper", "Can you give us a discount?"],
-    "Timing": ["We're not ready yet", "Maybe next quarter", "We need to discuss internally", "Call me back later"],
-    "Trust/Skepticism": ["We've been burned before", "How do we know this will work?", "Can you guarantee results?", "Sounds too good to be true"],
-    "DIY/In-House": ["We can build this in-house", "We have a tech team", "We're with another vendor", "We want to try ourselves first"],
-    "Understanding": ["I don't understand AI", "This seems complicated", "We're not a tech company", "Will our team use this?"],
-    "Need/Priority": ["We're doing fine", "Not a priority now", "We don't have this problem", "Focused on other initiatives"]
-}
-
-INDUSTRIES = {
-    "Real Estate": "long sales cycles, lead qualification, property management, document processing",
-    "Healthcare": "administrative burden, scheduling, patient communication, billing compliance",
-    "Professional Services": "client onboarding, proposal generation, time tracking, resource utilization",
-    "E-commerce": "customer support volume, order management, inventory, personalization",
-    "SaaS": "lead qualification, onboarding, churn prevention, feature adoption",
-    "Manufacturing": "supply chain, quality control, order processing, predictive maintenance",
-    "Financial Services": "compliance, client reporting, data analysis, fraud detection",
-    "Education": "student communication, enrollment, administrative tasks, personalized learning",
-    "Retail": "inventory management, customer engagement, multi-channel, demand forecasting",
-    "Hospitality": "booking management, guest communication, staff coordination, dynamic pricing"
-}
-
-TONES = {
-    "Professional": "Formal, business-focused, data-driven",
-    "Consultative": "Advisory, problem-solving, strategic",
-    "Enthusiastic": "Energetic, exciting, opportunity-focused",
-    "Direct": "Straight-forward, results-oriented",
-    "Empathetic": "Understanding, relationship-focused"
-}
-
-SALES_STRATEGIES = {
-    "Value-Based Selling": {
-        "description": "Focus on economic value and ROI",
-        "principles": ["Quantify status quo cost", "Align with business goals", "Prove ROI with data"]
-    },
-    "Challenger Sale": {
-        "description": "Challenge assumptions and teach new perspectives",
-        "principles": ["Teach unique insights", "Tailor to prospect role", "Take control of conversation"]
-    },
-    "Solution Selling": {
-        "description": "Diagnose problems and craft tailored solutions",
-        "principles": ["Ask open-ended questions", "Focus on the why", "Present comprehensive roadmap"]
-    },
-    "SPIN Selling": {
-        "description": "Question-based selling methodology",
-        "principles": ["Situation questions", "Problem questions", "Implication questions", "Need-payoff questions"]
-    }
-}
-
-SCRIPT_TEMPLATES = {
-    "Cold Call Opening": {"description": "Initial cold call to secure meeting", "duration": "30-45 seconds"},
-    "Discovery Call": {"description": "Deep-dive conversation to uncover needs", "duration": "20-30 minutes"},
-    "Demo Script": {"description": "Product demonstration with storytelling", "duration": "15-20 minutes"},
-    "Closing Call": {"description": "Final pitch to secure deal", "duration": "10-15 minutes"},
-    "Follow-Up Email": {"description": "Post-meeting email with value", "duration": "N/A"},
-    "Voicemail Script": {"description": "Concise voicemail for callback", "duration": "20-30 seconds"}
-}
-
-AI_MODELS = ["gpt-4o-mini", "gpt-4o", "gpt-3.5-turbo"]
-
-SYSTEM_PROMPTS = {
-    "pitch_generator": "You are an expert sales consultant for ATM Agency. Generate highly personalized, compelling sales pitches focused on quantifiable business outcomes.",
-    "objection_handler": "You are a master sales trainer. Provide strategic, empathetic objection responses as JSON: {empathetic, logic, story, handling_tips}.",
-    "script_writer": "You are an expert sales script writer. Create natural, conversational B2B scripts ready for immediate use."
-}
+import time
+import uuid
+
+from catalog import (
+    AI_MODELS, HISTORY_TYPES, INDUSTRIES, INDUSTRY_NAMES, INDUSTRY_PAIN_POINTS, OBJECTION_CATEGORIES, OBJECTIONS,
+    SALES_STRATEGIES, SCRIPT_TEMPLATES, SCRIPT_TYPES, SERVICE_NAMES, SERVICES, STRATEGY_NAMES, SYSTEM_PROMPTS, TONE_NAMES
+)
+from history_export import EXPORT_FORMATS, ExportJob, filter_history, iter_history
+from prefetch import Prefetcher, inflight, prefetch_report, record_prefetch_hit
+from startup import evict_client, get_client, openai_available, warm_up
+from state_backend import get_backend
+from usage_ledger import (BudgetExceeded, estimate_request, get_spend, record_usage, reserve_budget, settle_budget,
+                          DAILY_BUDGET_USD, MONTHLY_BUDGET_USD)
 
 # --- OpenAI Client Setup ---
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
-
-def get_openai_client() -> Optional[OpenAI]:
-    """Initialize OpenAI client"""
+# openai is imported lazily by startup.get_client on first use
+OPENAI_AVAILABLE = openai_available()
+
+def get_openai_client():
+    """Shared OpenAI client for the current API key"""
     api_key = st.session_state.get('openai_api_key') or os.environ.get('OPENAI_API_KEY')
     if api_key and OPENAI_AVAILABLE:
         try:
-            return OpenAI(api_key=api_key)
+            return get_client(api_key, os.environ.get('OPENAI_BASE_URL') or None)
         except Exception as e:
             st.error(f"Error: {str(e)}")
             return None
     return None
 
+# --- Shared State: Cache, History, Rate Limits ---
+# Shared response caching is opt-in: with it on, identical inputs return the
+# same text for every user until the entry expires
+RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 0))
+# Per-user request limit (0 = off)
+RATE_LIMIT_PER_MINUTE = int(os.environ.get('RATE_LIMIT_PER_MINUTE', 0))
+
+class RateLimitExceeded(Exception):
+    pass
+
+def _digest(value: str) -> str:
+    return hashlib.sha256(value.encode()).hexdigest()[:16]
+
+def get_owner_id() -> str:
+    """Stable id for the current API key, shared by every replica"""
+    api_key = st.session_state.get('openai_api_key') or os.environ.get('OPENAI_API_KEY') or ''
+    return _digest(api_key) if api_key else "anonymous"
+
+def get_user_id() -> str:
+    """A user's own pasted key identifies them across replicas, while
+    sessions running on the shared OPENAI_API_KEY are each a separate user"""
+    api_key = st.session_state.get('openai_api_key') or ''
+    if api_key and api_key != os.environ.get('OPENAI_API_KEY'):
+        return _digest(api_key)
+    return f"session:{st.session_state.session_id}"
+
+def check_rate_limit(user: str):
+    """Fixed one-minute window counted in the shared backend"""
+    if RATE_LIMIT_PER_MINUTE <= 0:
+        return
+    window = int(time.time() // 60)
+    count = get_backend().incr(f"ratelimit:{user}:{window}", ttl=120)
+    if count > RATE_LIMIT_PER_MINUTE:
+        raise RateLimitExceeded(f"Rate limit of {RATE_LIMIT_PER_MINUTE} requests/minute reached. Please wait a moment.")
+
+def get_history_key() -> Optional[str]:
+    """Backend key for users of their own pasted key. Shared-key sessions
+    cannot be found again once they end, so their history stays in
+    st.session_state (None)."""
+    user = get_user_id()
+    return None if user.startswith("session:") else f"history:{user}"
+
+def record_history(entry: Dict):
+    entry = {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"), **entry}
+    key = get_history_key()
+    if key:
+        get_backend().append(key, entry)
+    else:
+        st.session_state.history.append(entry)
+
+def history_entries() -> Iterable[Dict]:
+    key = get_history_key()
+    # A copy, since the export thread reads it while the session keeps appending
+    return iter_history(key) if key else list(st.session_state.history)
+
+def rate_limit_headroom(user: str) -> int:
+    """Requests left in the current window (large if limiting is off)"""
+    if RATE_LIMIT_PER_MINUTE <= 0:
+        return 1 << 30
+    window = int(time.time() // 60)
+    return RATE_LIMIT_PER_MINUTE - (get_backend().get(f"ratelimit:{user}:{window}") or 0)
+
+def build_request(task: str, prompt: str, max_tokens: int, json_mode: bool = False) -> Dict:
+    request = {
+        "model": st.session_state.ai_model,
+        "messages": [
+            {"role": "system", "content": SYSTEM_PROMPTS[task]},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": st.session_state.temperature,
+        "max_tokens": max_tokens
+    }
+    if json_mode:
+        request["response_format"] = {"type": "json_object"}
+    return request
+
+def request_cache_key(request: Dict) -> str:
+    return f"cache:{_digest(json.dumps(request, sort_keys=True))}"
+
+def run_completion(client, request: Dict, task: str, owner: str, user: str, session_id: str,
+                   prefetch: bool = False) -> Tuple[Optional[str], Optional[str], int, float]:
+    """Budget reservation, rate limit, API call, usage and cache write.
+    Touches no session state, so it is safe on background threads. Returns
+    (content, budget warning, total tokens, cost in USD); prefetches are skipped
+    (content None) once a soft budget warning or half the rate limit is hit."""
+    estimate = estimate_request(request["model"], request["messages"], request["max_tokens"])
+    reservation, warning = reserve_budget(owner, estimate["cost_usd"], user)
+    actual_cost = 0.0
+    try:
+        if prefetch and (warning or rate_limit_headroom(user) <= RATE_LIMIT_PER_MINUTE // 2):
+            return None, warning, 0, 0.0
+        check_rate_limit(user)
+        response = client.chat.completions.create(**request)
+        total_tokens = 0
+        if response.usage:
+            total_tokens = response.usage.prompt_tokens + response.usage.completion_tokens
+            actual_cost = record_usage(owner, session_id, f"{task} (prefetch)" if prefetch else task, request["model"],
+                                       response.usage.prompt_tokens, response.usage.completion_tokens)
+        else:
+            # No usage reported; keep the worst-case estimate charged
+            actual_cost = estimate["cost_usd"]
+    finally:
+        settle_budget(reservation, actual_cost)
+    content = response.choices[0].message.content
+    if request.get("response_format", {}).get("type") == "json_object":
+        # Raises on a truncated or invalid reply so it is never cached
+        json.loads(content)
+    if RESPONSE_CACHE_TTL > 0:
+        get_backend().set(request_cache_key(request), content, ttl=RESPONSE_CACHE_TTL)
+    return content, warning, total_tokens, actual_cost
+
+def chat_completion(client, task: str, prompt: str, max_tokens: int, json_mode: bool = False,
+                    slot: Optional[str] = None) -> str:
+    """Run a chat completion through the shared response cache and rate limiter.
+    `slot` names the prefetch slot the click belongs to."""
+    request = build_request(task, prompt, max_tokens, json_mode)
+    backend = get_backend()
+    cache_key = request_cache_key(request)
+    # The click supersedes a prefetch still waiting out its debounce
+    prefetcher = st.session_state.prefetchers.get(slot)
+    if prefetcher:
+        prefetcher.cancel()
+    with inflight(cache_key):
+        if RESPONSE_CACHE_TTL > 0:
+            cached = backend.get(cache_key)
+            backend.incr("stats:cache_hits" if cached is not None else "stats:cache_misses")
+            if cached is not None:
+                record_prefetch_hit(cache_key)
+                return cached
+        content, st.session_state.budget_warning, _, _ = run_completion(
+            client, request, task, get_owner_id(), get_user_id(), st.session_state.session_id)
+    return content
+
+def schedule_prefetch(slot: str, selection: tuple, task: str, prompt: Optional[str], max_tokens: int,
+                      json_mode: bool = False):
+    """Speculatively run a request once the user changes `slot`'s own widgets
+    (`selection`) and the change settles. A None prompt means the current
+    selection has nothing to prefetch."""
+    if not (st.session_state.prefetch_enabled and RESPONSE_CACHE_TTL > 0):
+        return
+    prefetchers = st.session_state.prefetchers
+    if slot not in prefetchers:
+        prefetchers[slot] = Prefetcher()
+    client = get_openai_client()
+    if prompt is None or not client:
+        prefetchers[slot].schedule(selection)
+        return
+    request = build_request(task, prompt, max_tokens, json_mode)
+    owner, user, session_id = get_owner_id(), get_user_id(), st.session_state.session_id
+
+    def run():
+        if get_backend().get(request_cache_key(request)) is not None:
+            return None
+        try:
+            content, _, tokens, cost = run_completion(client, request, task, owner, user, session_id, prefetch=True)
+        except BudgetExceeded:
+            return None
+        return None if content is None else (tokens, cost)
+
+    prefetchers[slot].schedule(selection, request_cache_key(request), run)
+
 # --- Session State ---
 def init_session():
     defaults = {
         'openai_api_key': os.environ.get('OPENAI_API_KEY', ''),
-        'generated_scripts': [],
+        'session_id': uuid.uuid4().hex,
+        'history': [],
+        'budget_warning': None,
+        'export_job': None,
+        'prefetch_enabled': RESPONSE_CACHE_TTL > 0 and os.environ.get('PREFETCH_ENABLED', '').lower() in ('1', 'true', 'yes'),
+        'prefetchers': {},
         'current_analysis': None,
         'ai_model': "gpt-4o-mini",
         'temperature': 0.7,
@@ -178,25 +249,14 @@ Requirements:
 Generate now:"""
 
     try:
-        response = client.chat.completions.create(
-            model=st.session_state.ai_model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPTS['pitch_generator']},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=st.session_state.temperature,
-            max_tokens=1000
-        )
-        return response.choices[0].message.content
+        pitch = chat_completion(client, 'pitch_generator', prompt, max_tokens=1000)
+        record_history({"type": "Pitch", "service": service, "industry": industry, "tone": tone, "content": pitch})
+        return pitch
     except Exception as e:
         return f"❌ Error: {str(e)}"
 
-def generate_objection_response(objection: str, context: str, prospect_info: str) -> Dict:
-    client = get_openai_client()
-    if not client:
-        return {"error": "API key required"}
-    
-    prompt = f"""Handle this sales objection:
+def build_objection_prompt(objection: str, context: str, prospect_info: str) -> str:
+    return f"""Handle this sales objection:
 OBJECTION: "{objection}"
 CONTEXT: {context or 'None'}
 PROSPECT: {prospect_info or 'None'}
@@ -209,30 +269,11 @@ Generate 3 strategic responses:
 Format as JSON: {{"empathetic": "...", "logic": "...", "story": "...", "handling_tips": ["tip1", "tip2", "tip3", "tip4", "tip5"]}}
 Return ONLY valid JSON."""
 
-    try:
-        response = client.chat.completions.create(
-            model=st.session_state.ai_model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPTS['objection_handler']},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=st.session_state.temperature,
-            max_tokens=1200,
-            response_format={"type": "json_object"}
-        )
-        return json.loads(response.choices[0].message.content)
-    except Exception as e:
-        return {"error": str(e)}
-
-def generate_script(script_type: str, service: str, industry: str, requirements: str) -> str:
-    client = get_openai_client()
-    if not client:
-        return "⚠️ API key required"
-    
+def build_script_prompt(script_type: str, service: str, industry: str, requirements: str) -> str:
     template = SCRIPT_TEMPLATES.get(script_type, {})
     service_info = SERVICES.get(service, {})
     
-    prompt = f"""Generate a complete {script_type} for ATM Agency.
+    return f"""Generate a complete {script_type} for ATM Agency.
 
 TYPE: {script_type}
 Description: {template.get('description')}
@@ -257,23 +298,30 @@ Instructions:
 
 Generate complete script:"""
 
+def generate_objection_response(objection: str, context: str, prospect_info: str) -> Dict:
+    client = get_openai_client()
+    if not client:
+        return {"error": "API key required"}
+    
+    prompt = build_objection_prompt(objection, context, prospect_info)
+
     try:
-        response = client.chat.completions.create(
-            model=st.session_state.ai_model,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPTS['script_writer']},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=st.session_state.temperature,
-            max_tokens=2000
-        )
-        script = response.choices[0].message.content
-        st.session_state.generated_scripts.append({
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "type": script_type,
-            "service": service,
-            "script": script
-        })
+        data = json.loads(chat_completion(client, 'objection_handler', prompt, max_tokens=1200, json_mode=True, slot="objection"))
+        record_history({"type": "Objection", "objection": objection, "content": data})
+        return data
+    except Exception as e:
+        return {"error": str(e)}
+
+def generate_script(script_type: str, service: str, industry: str, requirements: str) -> str:
+    client = get_openai_client()
+    if not client:
+        return "⚠️ API key required"
+    
+    prompt = build_script_prompt(script_type, service, industry, requirements)
+
+    try:
+        script = chat_completion(client, 'script_writer', prompt, max_tokens=2000, slot="script")
+        record_history({"type": script_type, "service": service, "industry": industry, "content": script})
         return script
     except Exception as e:
         return f"❌ Error: {str(e)}"
@@ -281,6 +329,7 @@ Generate complete script:"""
 # --- Main App ---
 def main():
     init_session()
+    warm_up(st.session_state.openai_api_key)
     
     st.set_page_config(page_title="ATM Agency - AI Sales Assistant", page_icon="🎯", layout="wide")
     
@@ -342,6 +391,10 @@ def main():
             help="Enter your OpenAI API key to use AI generation features"
         )
         if api_key_input != st.session_state.openai_api_key:
+            # Drop the replaced key's client unless it is the shared server key
+            old_key = st.session_state.openai_api_key
+            if old_key and old_key != os.environ.get('OPENAI_API_KEY'):
+                evict_client(old_key, os.environ.get('OPENAI_BASE_URL') or None)
             st.session_state.openai_api_key = api_key_input
             st.rerun()
     
@@ -351,10 +404,31 @@ def main():
     with col3:
         st.session_state.temperature = st.slider("Creativity", 0.0, 1.0, st.session_state.temperature, 0.1)
     
+    spend = get_spend(get_owner_id())
+    budget_note = " | ".join(
+        f"{label}: ${spend[period]:.4f}" + (f" of ${budget:.2f}" if budget > 0 else "")
+        for label, period, budget in (("Today", "day", DAILY_BUDGET_USD), ("This month", "month", MONTHLY_BUDGET_USD))
+    )
+    st.caption(f"💰 Usage — {budget_note}")
+    if RESPONSE_CACHE_TTL > 0:
+        backend = get_backend()
+        st.caption(f"🗄️ Response cache — hits: {backend.get('stats:cache_hits') or 0} | "
+                   f"misses: {backend.get('stats:cache_misses') or 0}")
+    # Prefetched results reach the click through the shared response cache
+    st.checkbox("⚡ Speculative prefetch", key='prefetch_enabled', disabled=RESPONSE_CACHE_TTL <= 0,
+                help="Start likely generations in the background once your selections settle" if RESPONSE_CACHE_TTL > 0
+                else "Needs the shared response cache; set RESPONSE_CACHE_TTL to enable it")
+    if st.session_state.prefetch_enabled:
+        stats = prefetch_report()
+        st.caption(f"⚡ Prefetch — hits: {stats['hits']}/{stats['issued']} ({stats['hit_rate']:.0%}) | "
+                   f"unused: {stats['wasted_tokens']} tokens (${stats['wasted_cost_usd']:.4f}) | skipped: {stats['skipped']}")
+    if st.session_state.budget_warning:
+        st.warning(f"⚠️ {st.session_state.budget_warning}")
+    
     st.markdown("---")
     
     # Main Tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["🎯 Pitch Generator", "🛡️ Objection Handler", "📝 Script Generator", "📚 Service Catalog"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(["🎯 Pitch Generator", "🛡️ Objection Handler", "📝 Script Generator", "📚 Service Catalog", "🗂️ History & Export"])
     
     # TAB 1: Pitch Generator
     with tab1:
@@ -367,12 +441,12 @@ def main():
             additional_context = st.text_area("Additional Context (Optional)", height=80, placeholder="Focus on compliance issues...")
         
         with col2:
-            service = st.selectbox("Service to Pitch", list(SERVICES.keys()))
-            industry = st.selectbox("Prospect Industry", list(INDUSTRIES.keys()))
-            tone = st.selectbox("Pitch Tone", list(TONES.keys()))
-            strategy = st.selectbox("Sales Strategy", list(SALES_STRATEGIES.keys()))
+            service = st.selectbox("Service to Pitch", SERVICE_NAMES)
+            industry = st.selectbox("Prospect Industry", INDUSTRY_NAMES)
+            tone = st.selectbox("Pitch Tone", TONE_NAMES)
+            strategy = st.selectbox("Sales Strategy", STRATEGY_NAMES)
             
-            default_pains = INDUSTRIES.get(industry, "").split(', ')
+            default_pains = INDUSTRY_PAIN_POINTS.get(industry, [])
             pain_points = st.multiselect(
                 "Specific Pain Points",
                 options=default_pains + ["High costs", "Low conversion", "Poor data quality", "Legacy systems"],
@@ -400,7 +474,7 @@ def main():
         
         col1, col2 = st.columns(2)
         with col1:
-            objection_cat = st.selectbox("Objection Category", list(OBJECTIONS.keys()))
+            objection_cat = st.selectbox("Objection Category", OBJECTION_CATEGORIES)
             predefined = OBJECTIONS.get(objection_cat, [])
             objection_select = st.selectbox("Select or Enter Custom", ["Custom"] + predefined)
             
@@ -413,6 +487,11 @@ def main():
             context = st.text_area("Conversation Context", height=100, placeholder="Said after ROI presentation...")
             prospect_info = st.text_area("Prospect Details", height=100, placeholder="CFO of manufacturing firm...")
         
+        # "Custom" (the default) has nothing to prefetch until the rep clicks
+        schedule_prefetch("objection", (objection_cat, objection_select, context, prospect_info), 'objection_handler',
+                          None if objection_select == "Custom" else build_objection_prompt(final_objection, context, prospect_info),
+                          max_tokens=1200, json_mode=True)
+        
         if st.button("💡 Generate Responses", use_container_width=True, type="primary"):
             if not get_openai_client():
                 st.error("⚠️ Please enter your OpenAI API key above")
@@ -446,13 +525,16 @@ def main():
         
         col1, col2 = st.columns(2)
         with col1:
-            script_type = st.selectbox("Script Type", list(SCRIPT_TEMPLATES.keys()))
-            service = st.selectbox("Target Service", list(SERVICES.keys()), key="script_service")
+            script_type = st.selectbox("Script Type", SCRIPT_TYPES)
+            service = st.selectbox("Target Service", SERVICE_NAMES, key="script_service")
         
         with col2:
-            industry = st.selectbox("Target Industry", list(INDUSTRIES.keys()), key="script_industry")
+            industry = st.selectbox("Target Industry", INDUSTRY_NAMES, key="script_industry")
             requirements = st.text_area("Specific Requirements (Optional)", height=100, placeholder="Mention recent regulation changes...")
         
+        schedule_prefetch("script", (script_type, service, industry, requirements), 'script_writer',
+                          build_script_prompt(script_type, service, industry, requirements), max_tokens=2000)
+        
         if st.button("📝 Generate Script", use_container_width=True, type="primary"):
             if not get_openai_client():
                 st.error("⚠️ Please enter your OpenAI API key above")
@@ -480,6 +562,50 @@ def main():
                 for uc in data['use_cases']:
                     st.markdown(f"- {uc}")
                 st.info(f"**ROI:** {data['roi_points']}")
+    
+    # TAB 5: History & Bulk Export
+    with tab5:
+        st.subheader("Generation History & Bulk Export")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            start_date = st.date_input("From", value=datetime.now().date() - timedelta(days=30))
+            end_date = st.date_input("To", value=datetime.now().date())
+            export_types = st.multiselect("Types", HISTORY_TYPES)
+        
+        with col2:
+            export_services = st.multiselect("Services", SERVICE_NAMES)
+            export_industries = st.multiselect("Industries", INDUSTRY_NAMES)
+            export_format = st.selectbox("Format", list(EXPORT_FORMATS.keys()))
+        
+        job = st.session_state.export_job
+        if st.button("📦 Export History as ZIP", use_container_width=True, type="primary", disabled=bool(job and not job.done)):
+            if job:
+                job.cleanup()
+            entries = filter_history(history_entries(), start_date.isoformat(), end_date.isoformat(),
+                                     export_services, export_industries, export_types)
+            st.session_state.export_job = job = ExportJob(entries, EXPORT_FORMATS[export_format])
+        
+        if job:
+            if not job.done:
+                st.info(f"⏳ Exporting... {job.exported} documents ({job.bytes_written / 1024:.0f} KB written)")
+                st.button("🔄 Refresh Progress")
+            elif job.error:
+                st.error(f"Export failed: {job.error}")
+            elif not job.exported:
+                st.warning("No history matches these filters.")
+            else:
+                st.success(f"✅ Exported {job.exported} documents ({job.bytes_written / 1024:.0f} KB)")
+                col1, col2 = st.columns(2)
+                with col1:
+                    # The archive is read from disk only when the button is clicked
+                    st.download_button("📥 Download ZIP", job.read, f"history_{datetime.now().strftime('%Y%m%d')}.zip",
+                                       mime="application/zip", use_container_width=True)
+                with col2:
+                    if st.button("🗑️ Clear Export", use_container_width=True):
+                        job.cleanup()
+                        st.session_state.export_job = None
+                        st.rerun()
 
 if __name__ == "__main__":
     main()
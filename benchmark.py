@@ -0,0 +1,321 @@
+import argparse
+import json
+import os
+import statistics
+import multiprocessing
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from stub_openai import start_stub_server
+
+# --- Benchmark Suite ---
+# Runs the app against the local stub server (stub_openai.py) and reports
+# latency, rerun time and throughput. Usage:
+#   python benchmark.py --output bench.json
+#   python benchmark.py --baseline bench.json --tolerance 0.2
+# Generate scenarios run with the response cache off (every click reaches
+# the stub) and on (repeated clicks are cache hits); both are reported.
+# Benchmark clients never retry, so injected stub errors count as errors.
+# The app's own client does retry; app scenarios report the stub errors
+# it absorbed as stub_errors.
+
+APP_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Button index of each tab's generate action in render order
+TAB_ACTIONS = {
+    "pitch": 0,
+    "objection": 1,
+    "script": 2
+}
+
+# Predefined objection picked before clicking tab 2 (its default is "Custom")
+BENCH_OBJECTION = "It's too expensive"
+
+def summarize(samples: List[float], errors: int = 0) -> Dict:
+    """Latency summary in milliseconds"""
+    if not samples:
+        return {"count": 0, "errors": errors}
+    ordered = sorted(samples)
+    def pct(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+    return {
+        "count": len(samples),
+        "errors": errors,
+        "mean_ms": round(statistics.mean(samples) * 1000, 2),
+        "p50_ms": round(pct(0.50) * 1000, 2),
+        "p95_ms": round(pct(0.95) * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2)
+    }
+
+def timed(fn: Callable, iterations: int) -> Tuple[List[float], int]:
+    """Successful sample durations and the number of failed iterations"""
+    samples, errors = [], 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            errors += 1
+            continue
+        samples.append(time.perf_counter() - start)
+    return samples, errors
+
+def timed_summary(fn: Callable, iterations: int) -> Dict:
+    return summarize(*timed(fn, iterations))
+
+def set_cache(enabled: bool):
+    """app.py reads RESPONSE_CACHE_TTL on every script run"""
+    os.environ["RESPONSE_CACHE_TTL"] = "3600" if enabled else "0"
+
+# --- App Sessions ---
+def new_session(timeout: float = 60):
+    """A fresh simulated browser session running app.py"""
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+    at.run()
+    return at
+
+def click_action(at, tab: str):
+    if tab == "objection":
+        next(sb for sb in at.selectbox if sb.label == "Select or Enter Custom").set_value(BENCH_OBJECTION)
+    at.button[TAB_ACTIONS[tab]].click().run()
+    if at.exception:
+        raise RuntimeError(f"{tab} run raised: {at.exception[0].value}")
+    result = at.session_state.current_analysis if "current_analysis" in at.session_state else None
+    if not result or result.get("type") != tab:
+        raise RuntimeError(f"{tab} click produced no result")
+    content = result.get("data") if tab == "objection" else result.get("content")
+    if isinstance(content, dict) and "error" in content:
+        raise RuntimeError(f"{tab} failed: {content['error']}")
+    if isinstance(content, str) and content.startswith(("❌", "⚠️")):
+        raise RuntimeError(f"{tab} failed: {content}")
+
+# --- Scenarios ---
+def bench_client_latency(iterations: int) -> Dict:
+    """Single-request latency of the raw chat-completions call (JSON and streaming)"""
+    from openai import OpenAI
+    client = OpenAI(api_key="stub", base_url=os.environ["OPENAI_BASE_URL"], max_retries=0)
+    messages = [{"role": "user", "content": "Generate a personalized sales pitch."}]
+
+    def plain():
+        client.chat.completions.create(model="gpt-4o-mini", messages=messages, max_tokens=1000)
+
+    def json_mode():
+        client.chat.completions.create(model="gpt-4o-mini", messages=messages, max_tokens=1200,
+                                       response_format={"type": "json_object"})
+
+    def streaming():
+        for _ in client.chat.completions.create(model="gpt-4o-mini", messages=messages, max_tokens=1000, stream=True):
+            pass
+
+    return {
+        "plain": timed_summary(plain, iterations),
+        "json_mode": timed_summary(json_mode, iterations),
+        "streaming": timed_summary(streaming, iterations)
+    }
+
+def bench_renders(iterations: int, stub) -> Dict:
+    """Cold start, idle rerun and per-tab generate+render time inside one
+    session, with the response cache off and on"""
+    set_cache(False)
+    results = {"cold_start": timed_summary(new_session, max(1, iterations // 2))}
+    at = new_session()
+    results["idle_rerun"] = timed_summary(at.run, iterations)
+    for cached in (False, True):
+        set_cache(cached)
+        for tab in TAB_ACTIONS:
+            before = stub.stats.snapshot()
+            stats = timed_summary(lambda: click_action(at, tab), iterations)
+            stats.update(_stub_delta(stub, before))
+            results[f"generate_{tab}" + ("_cached" if cached else "")] = stats
+    set_cache(False)
+    return results
+
+def _stub_delta(stub, before: Dict) -> Dict:
+    """Stub requests and errors (including ones the app's client retried) since `before`"""
+    after = stub.stats.snapshot()
+    return {"stub_requests": after["requests"] - before["requests"],
+            "stub_errors": after["errors"] - before["errors"]}
+
+def _warm_worker(_) -> bool:
+    from streamlit.testing.v1 import AppTest  # noqa: F401
+    return True
+
+def _session_process(actions_per_session: int) -> Tuple[List[float], List[str]]:
+    """One simulated session in its own process; AppTest is not safe to run
+    from several threads of one process"""
+    tabs = list(TAB_ACTIONS)
+    latencies, errors = [], []
+    try:
+        at = new_session()
+    except Exception as e:
+        return latencies, [f"session start: {e}"] * actions_per_session
+    for i in range(actions_per_session):
+        start = time.perf_counter()
+        try:
+            click_action(at, tabs[i % len(tabs)])
+        except Exception as e:
+            errors.append(str(e))
+            continue
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+def bench_sessions(concurrency: List[int], actions_per_session: int, stub) -> Dict:
+    """Throughput of N concurrent simulated sessions, each cycling through the tabs"""
+    # Reference workers through the module: AppTest replaces sys.modules["__main__"]
+    # while it runs app.py, which breaks pickling of functions defined in __main__
+    import benchmark
+    results = {}
+    set_cache(False)
+    context = multiprocessing.get_context("spawn")
+    for n in concurrency:
+        latencies: List[float] = []
+        errors: List[str] = []
+        with ProcessPoolExecutor(max_workers=n, mp_context=context) as pool:
+            # Pay interpreter and import start-up before the clock starts
+            list(pool.map(benchmark._warm_worker, range(n)))
+            before = stub.stats.snapshot()
+            start = time.perf_counter()
+            for session_latencies, session_errors in pool.map(benchmark._session_process, [actions_per_session] * n):
+                latencies += session_latencies
+                errors += session_errors
+            elapsed = time.perf_counter() - start
+        results[f"sessions_{n}"] = {
+            **summarize(latencies, len(errors)),
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            **_stub_delta(stub, before)
+        }
+    return results
+
+def bench_batch(concurrency: List[int], jobs: int) -> Dict:
+    """Throughput of a batch of generate calls issued from a worker pool"""
+    from openai import OpenAI
+    client = OpenAI(api_key="stub", base_url=os.environ["OPENAI_BASE_URL"], max_retries=0)
+    messages = [{"role": "user", "content": "Generate a complete Cold Call Opening."}]
+    results = {}
+    for n in concurrency:
+        errors = []
+
+        def job(_) -> Optional[float]:
+            start = time.perf_counter()
+            try:
+                client.chat.completions.create(model="gpt-4o-mini", messages=messages, max_tokens=2000)
+            except Exception as e:
+                errors.append(str(e))
+                return None
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=n) as pool:
+            # Failed jobs are counted, not timed, as in timed()
+            latencies = [t for t in pool.map(job, range(jobs)) if t is not None]
+        elapsed = time.perf_counter() - start
+        results[f"workers_{n}"] = {
+            **summarize(latencies, len(errors)),
+            "throughput_rps": round(jobs / elapsed, 2) if elapsed else 0.0
+        }
+    return results
+
+# --- Reporting ---
+def compare(report: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """Scenarios that failed or regressed by more than `tolerance` versus the
+    baseline (slower p95, lower throughput, more errors or stub errors)"""
+    regressions = []
+    for group, scenarios in report["results"].items():
+        for name, stats in scenarios.items():
+            label = f"{group}.{name}"
+            old = baseline.get("results", {}).get(group, {}).get(name) or {}
+            for counter in ("errors", "stub_errors"):
+                if stats.get(counter, 0) > old.get(counter, 0):
+                    regressions.append(f"{label}: {counter} {old.get(counter, 0)} -> {stats[counter]}")
+            if "p95_ms" in old and "p95_ms" in stats and stats["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+                regressions.append(f"{label}: p95 {old['p95_ms']}ms -> {stats['p95_ms']}ms")
+            if "throughput_rps" in old and "throughput_rps" in stats \
+                    and stats["throughput_rps"] < old["throughput_rps"] * (1 - tolerance):
+                regressions.append(f"{label}: throughput {old['throughput_rps']} -> {stats['throughput_rps']} rps")
+    return regressions
+
+def print_report(report: Dict):
+    print(f"Benchmark {report['timestamp']} | stub: {report['stub']}")
+    for group, scenarios in report["results"].items():
+        print(f"\n[{group}]")
+        for name, stats in scenarios.items():
+            extra = f" rps={stats['throughput_rps']}" if "throughput_rps" in stats else ""
+            if "stub_requests" in stats:
+                extra += f" stub_requests={stats['stub_requests']} stub_errors={stats['stub_errors']}"
+            print(f"  {name:<24} n={stats.get('count', 0):<4} mean={stats.get('mean_ms', '-')}ms "
+                  f"p50={stats.get('p50_ms', '-')}ms p95={stats.get('p95_ms', '-')}ms "
+                  f"errors={stats.get('errors', 0)}{extra}")
+
+def run(args) -> Dict:
+    stub_options = {
+        "latency": args.latency,
+        "token_rate": args.token_rate,
+        "completion_tokens": args.completion_tokens,
+        "error_rate": args.error_rate,
+        "seed": 0
+    }
+    server = start_stub_server(**stub_options)
+    os.environ["OPENAI_BASE_URL"] = server.base_url
+    os.environ["OPENAI_API_KEY"] = "sk-stub"
+
+    concurrency = [int(n) for n in args.concurrency.split(",")]
+    scenarios = {
+        "client": lambda: bench_client_latency(args.iterations),
+        "render": lambda: bench_renders(args.iterations, server),
+        "sessions": lambda: bench_sessions(concurrency, args.actions, server),
+        "batch": lambda: bench_batch(concurrency, args.jobs)
+    }
+    selected = args.only.split(",") if args.only else list(scenarios)
+    try:
+        results = {name: scenarios[name]() for name in selected}
+    finally:
+        server.shutdown()
+
+    return {
+        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "python": sys.version.split()[0],
+        "stub": stub_options,
+        "stub_traffic": server.stats.snapshot(),
+        "results": results
+    }
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the sales assistant against a local stub OpenAI server")
+    parser.add_argument("--iterations", type=int, default=10, help="Samples per latency scenario")
+    parser.add_argument("--concurrency", default="1,4,8", help="Comma-separated session/worker counts")
+    parser.add_argument("--actions", type=int, default=3, help="Generate clicks per simulated session")
+    parser.add_argument("--jobs", type=int, default=32, help="Requests per batch run")
+    parser.add_argument("--only", default="", help="Comma-separated subset of: client,render,sessions,batch")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub time to first token (s)")
+    parser.add_argument("--token-rate", type=float, default=2000.0, help="Stub tokens per second")
+    parser.add_argument("--completion-tokens", type=int, default=300)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--output", help="Write the JSON report to this path")
+    parser.add_argument("--baseline", help="Compare against a previous JSON report")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="Allowed p95 slowdown / throughput drop vs baseline (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+# --- Catalog ---
+# Static catalog data and the lookup lists derived from it. Kept out of
+# app.py so it is evaluated once per server process rather than on every
+# Streamlit rerun of the script. The content is the catalog the app has
+# always embedded; the long-form config.py is a separate, unused draft.
+
+SERVICES = {
+    "Custom AI Apps": {
+        "description": "Bespoke AI-powered applications tailored to your business needs",
+        "benefits": ["Automate workflows by 70%+", "Scale without headcount", "Competitive advantage", "Seamless integration"],
+        "use_cases": ["Document processing", "Predictive analytics", "Virtual agents", "Workflow automation"],
+        "roi_points": "300-500% ROI within first year"
+    },
+    "PMS/CRM Systems": {
+        "description": "AI-enhanced Project Management and CRM platforms",
+        "benefits": ["Centralize client data", "AI-powered lead scoring", "Automated follow-ups", "Real-time analytics"],
+        "use_cases": ["Sales pipeline management", "Resource allocation", "Customer lifecycle management", "Automated reporting"],
+        "roi_points": "35% sales conversion increase, 60% admin time reduction"
+    },
+    "AI Marketplace": {
+        "description": "Custom marketplace platforms with AI matching and pricing",
+        "benefits": ["AI recommendations", "Intelligent search", "Automated matching", "Dynamic pricing"],
+        "use_cases": ["B2B marketplaces", "E-commerce engines", "Talent platforms", "Resource sharing"],
+        "roi_points": "45% transaction volume increase, 25% platform stickiness boost"
+    },
+    "AI Voice Agents": {
+        "description": "24/7 intelligent voice assistants for customer service and sales",
+        "benefits": ["Unlimited simultaneous calls", "Multi-language support", "Auto lead qualification", "80% cost reduction"],
+        "use_cases": ["Customer support", "Sales calls", "Appointment scheduling", "Order taking"],
+        "roi_points": "$50,000+ annual savings per rep replaced"
+    },
+    "Website & Funnels": {
+        "description": "High-converting websites and sales funnels with AI optimization",
+        "benefits": ["AI personalization", "Real-time A/B testing", "Intelligent chatbots", "CRO through ML"],
+        "use_cases": ["Lead generation pages", "E-commerce funnels", "SaaS onboarding", "Event registration"],
+        "roi_points": "2-3x conversion rate increase within 90 days"
+    },
+    "AI Automations": {
+        "description": "End-to-end business process automation with AI",
+        "benefits": ["Eliminate manual tasks", "Unified workflows", "Intelligent decisions", "Scale without hiring"],
+        "use_cases": ["Data entry automation", "Email automation", "Social media management", "Report generation"],
+        "roi_points": "20-30 hours saved per employee weekly"
+    }
+}
+
+OBJECTIONS = {
+    "Price/Budget": ["It's too expensive", "We don't have the budget", "Your competitors are cheaper", "Can you give us a discount?"],
+    "Timing": ["We're not ready yet", "Maybe next quarter", "We need to discuss internally", "Call me back later"],
+    "Trust/Skepticism": ["We've been burned before", "How do we know this will work?", "Can you guarantee results?", "Sounds too good to be true"],
+    "DIY/In-House": ["We can build this in-house", "We have a tech team", "We're with another vendor", "We want to try ourselves first"],
+    "Understanding": ["I don't understand AI", "This seems complicated", "We're not a tech company", "Will our team use this?"],
+    "Need/Priority": ["We're doing fine", "Not a priority now", "We don't have this problem", "Focused on other initiatives"]
+}
+
+INDUSTRIES = {
+    "Real Estate": "long sales cycles, lead qualification, property management, document processing",
+    "Healthcare": "administrative burden, scheduling, patient communication, billing compliance",
+    "Professional Services": "client onboarding, proposal generation, time tracking, resource utilization",
+    "E-commerce": "customer support volume, order management, inventory, personalization",
+    "SaaS": "lead qualification, onboarding, churn prevention, feature adoption",
+    "Manufacturing": "supply chain, quality control, order processing, predictive maintenance",
+    "Financial Services": "compliance, client reporting, data analysis, fraud detection",
+    "Education": "student communication, enrollment, administrative tasks, personalized learning",
+    "Retail": "inventory management, customer engagement, multi-channel, demand forecasting",
+    "Hospitality": "booking management, guest communication, staff coordination, dynamic pricing"
+}
+
+TONES = {
+    "Professional": "Formal, business-focused, data-driven",
+    "Consultative": "Advisory, problem-solving, strategic",
+    "Enthusiastic": "Energetic, exciting, opportunity-focused",
+    "Direct": "Straight-forward, results-oriented",
+    "Empathetic": "Understanding, relationship-focused"
+}
+
+SALES_STRATEGIES = {
+    "Value-Based Selling": {
+        "description": "Focus on economic value and ROI",
+        "principles": ["Quantify status quo cost", "Align with business goals", "Prove ROI with data"]
+    },
+    "Challenger Sale": {
+        "description": "Challenge assumptions and teach new perspectives",
+        "principles": ["Teach unique insights", "Tailor to prospect role", "Take control of conversation"]
+    },
+    "Solution Selling": {
+        "description": "Diagnose problems and craft tailored solutions",
+        "principles": ["Ask open-ended questions", "Focus on the why", "Present comprehensive roadmap"]
+    },
+    "SPIN Selling": {
+        "description": "Question-based selling methodology",
+        "principles": ["Situation questions", "Problem questions", "Implication questions", "Need-payoff questions"]
+    }
+}
+
+SCRIPT_TEMPLATES = {
+    "Cold Call Opening": {"description": "Initial cold call to secure meeting", "duration": "30-45 seconds"},
+    "Discovery Call": {"description": "Deep-dive conversation to uncover needs", "duration": "20-30 minutes"},
+    "Demo Script": {"description": "Product demonstration with storytelling", "duration": "15-20 minutes"},
+    "Closing Call": {"description": "Final pitch to secure deal", "duration": "10-15 minutes"},
+    "Follow-Up Email": {"description": "Post-meeting email with value", "duration": "N/A"},
+    "Voicemail Script": {"description": "Concise voicemail for callback", "duration": "20-30 seconds"}
+}
+
+AI_MODELS = ["gpt-4o-mini", "gpt-4o", "gpt-3.5-turbo"]
+
+SYSTEM_PROMPTS = {
+    "pitch_generator": "You are an expert sales consultant for ATM Agency. Generate highly personalized, compelling sales pitches focused on quantifiable business outcomes.",
+    "objection_handler": "You are a master sales trainer. Provide strategic, empathetic objection responses as JSON: {empathetic, logic, story, handling_tips}.",
+    "script_writer": "You are an expert sales script writer. Create natural, conversational B2B scripts ready for immediate use."
+}
+
+# --- Precomputed Indexes ---
+SERVICE_NAMES = list(SERVICES.keys())
+INDUSTRY_NAMES = list(INDUSTRIES.keys())
+TONE_NAMES = list(TONES.keys())
+STRATEGY_NAMES = list(SALES_STRATEGIES.keys())
+OBJECTION_CATEGORIES = list(OBJECTIONS.keys())
+SCRIPT_TYPES = list(SCRIPT_TEMPLATES.keys())
+INDUSTRY_PAIN_POINTS = {name: pains.split(', ') for name, pains in INDUSTRIES.items()}
+HISTORY_TYPES = ["Pitch", "Objection"] + SCRIPT_TYPES
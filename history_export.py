@@ -0,0 +1,255 @@
+import importlib.util
+import io
+import os
+import re
+import tempfile
+import threading
+import zipfile
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from state_backend import get_backend
+
+# --- Bulk History Export ---
+# Streams a filtered slice of the generation history into a ZIP of
+# Markdown, DOCX or PDF files. History is read from the backend in pages
+# and the archive is emitted in chunks, so memory stays bounded by one
+# page plus one document regardless of how much history is exported.
+
+# Export libraries are imported inside their renderers to keep app start fast
+DOCX_AVAILABLE = importlib.util.find_spec("docx") is not None
+PDF_AVAILABLE = importlib.util.find_spec("fpdf") is not None
+
+# Only formats whose library is installed are offered
+EXPORT_FORMATS = {
+    "Markdown": "md",
+    **({"DOCX": "docx"} if DOCX_AVAILABLE else {}),
+    **({"PDF": "pdf"} if PDF_AVAILABLE else {})
+}
+PAGE_SIZE = 200
+CHUNK_SIZE = 64 * 1024
+
+def iter_history(key: str, page_size: int = PAGE_SIZE) -> Iterator[Dict]:
+    """Walk a history list in the shared backend one page at a time"""
+    backend = get_backend()
+    start = 0
+    while True:
+        page = backend.list_range(key, start, start + page_size - 1)
+        yield from page
+        if len(page) < page_size:
+            return
+        start += page_size
+
+def filter_history(entries: Iterable[Dict], start_date: Optional[str] = None, end_date: Optional[str] = None,
+                   services: Optional[List[str]] = None, industries: Optional[List[str]] = None,
+                   types: Optional[List[str]] = None) -> Iterator[Dict]:
+    """Dates are inclusive YYYY-MM-DD strings; empty filters match everything"""
+    for entry in entries:
+        day = entry.get("timestamp", "")[:10]
+        if start_date and day < start_date:
+            continue
+        if end_date and day > end_date:
+            continue
+        if services and entry.get("service") not in services:
+            continue
+        if industries and entry.get("industry") not in industries:
+            continue
+        if types and entry.get("type") not in types:
+            continue
+        yield entry
+
+# --- Document Rendering ---
+def _sections(entry: Dict) -> List[tuple]:
+    """(heading, text) pairs shared by every output format"""
+    content = entry.get("content")
+    if isinstance(content, dict):
+        sections = [("Objection", entry.get("objection", ""))]
+        for key, label in (("empathetic", "Empathetic Approach"), ("logic", "Logic-Based Approach"),
+                           ("story", "Story-Based Approach")):
+            sections.append((label, content.get(key, "N/A")))
+        tips = content.get("handling_tips", [])
+        sections.append(("Handling Tips", "\n".join(f"{i}. {tip}" for i, tip in enumerate(tips, 1))))
+        return sections
+    return [("", content or "")]
+
+def _metadata(entry: Dict) -> str:
+    fields = [(label, entry.get(key)) for key, label in
+              (("timestamp", "Generated"), ("service", "Service"), ("industry", "Industry"), ("tone", "Tone"))]
+    return " | ".join(f"**{label}:** {value}" for label, value in fields if value)
+
+def to_markdown(entry: Dict) -> bytes:
+    lines = [f"# {entry.get('type', 'Generation')}", "", _metadata(entry), ""]
+    for heading, text in _sections(entry):
+        if heading:
+            lines += [f"## {heading}", ""]
+        lines += [text, ""]
+    return "\n".join(lines).encode("utf-8")
+
+def to_docx(entry: Dict) -> bytes:
+    if not DOCX_AVAILABLE:
+        raise RuntimeError("DOCX export requires python-docx (pip install python-docx)")
+    import docx
+    document = docx.Document()
+    document.add_heading(entry.get("type", "Generation"), level=1)
+    document.add_paragraph(_metadata(entry).replace("**", ""))
+    for heading, text in _sections(entry):
+        if heading:
+            document.add_heading(heading, level=2)
+        for paragraph in text.split("\n"):
+            document.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def to_pdf(entry: Dict) -> bytes:
+    if not PDF_AVAILABLE:
+        raise RuntimeError("PDF export requires fpdf2 (pip install fpdf2)")
+    from fpdf import FPDF
+    from fpdf.enums import XPos, YPos
+    # Core PDF fonts are latin-1 only; emoji and other symbols are replaced
+    latin = lambda text: text.encode("latin-1", "replace").decode("latin-1")
+    # Each cell returns to the left margin on the next line, otherwise the
+    # following full-width cell starts at the right edge and has no room
+    cell = lambda height, text: pdf.multi_cell(0, height, latin(text), new_x=XPos.LMARGIN, new_y=YPos.NEXT)
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 16)
+    cell(10, entry.get("type", "Generation"))
+    pdf.set_font("Helvetica", "I", 9)
+    cell(6, _metadata(entry).replace("**", ""))
+    for heading, text in _sections(entry):
+        if heading:
+            pdf.set_font("Helvetica", "B", 12)
+            cell(8, heading)
+        pdf.set_font("Helvetica", "", 11)
+        cell(6, text)
+    return bytes(pdf.output())
+
+RENDERERS = {
+    "md": to_markdown,
+    "docx": to_docx,
+    "pdf": to_pdf
+}
+
+def export_filename(index: int, entry: Dict, ext: str) -> str:
+    label = re.sub(r"[^A-Za-z0-9]+", "_", entry.get("type", "generation")).strip("_").lower()
+    stamp = re.sub(r"[^0-9]", "", entry.get("timestamp", ""))
+    return f"{index:05d}_{label}_{stamp}.{ext}"
+
+# --- Streaming ZIP ---
+class _ChunkSink:
+    """Write-only, unseekable file object; zipfile falls back to data
+    descriptors for these, so the archive can be emitted progressively"""
+
+    def __init__(self):
+        self._buffer = io.BytesIO()
+
+    def write(self, data: bytes) -> int:
+        return self._buffer.write(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = self._buffer.getvalue()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return data
+
+def stream_zip(entries: Iterable[Dict], ext: str = "md", chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a ZIP archive of rendered entries in chunks of about chunk_size bytes"""
+    render = RENDERERS[ext]
+    sink = _ChunkSink()
+    pending = b""
+    with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for index, entry in enumerate(entries, 1):
+            archive.writestr(export_filename(index, entry, ext), render(entry))
+            pending += sink.drain()
+            while len(pending) >= chunk_size:
+                yield pending[:chunk_size]
+                pending = pending[chunk_size:]
+    pending += sink.drain()
+    if pending:
+        yield pending
+
+# --- Background Export Job ---
+class ExportJob:
+    """Writes a streamed archive to a temp file on a worker thread so the
+    Streamlit script thread only polls progress. Call cleanup() when the job
+    is replaced or dismissed; failed or empty exports remove their file."""
+
+    def __init__(self, entries: Iterable[Dict], ext: str):
+        self.ext = ext
+        self.exported = 0
+        self.bytes_written = 0
+        self.done = False
+        self.error: Optional[str] = None
+        fd, self.path = tempfile.mkstemp(prefix="history_export_", suffix=".zip")
+        os.close(fd)
+        self._entries = entries
+        self._discarded = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _counted(self) -> Iterator[Dict]:
+        for entry in self._entries:
+            yield entry
+            self.exported += 1
+
+    def _run(self):
+        try:
+            with open(self.path, "wb") as f:
+                for chunk in stream_zip(self._counted(), self.ext):
+                    f.write(chunk)
+                    self.bytes_written += len(chunk)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            with self._lock:
+                if self.error or not self.exported or self._discarded:
+                    self._unlink()
+                self.done = True
+
+    def _unlink(self):
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def read(self) -> bytes:
+        """Archive contents; only called when the user clicks download"""
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def cleanup(self):
+        """Remove the temp file now, or as soon as a running export finishes"""
+        with self._lock:
+            self._discarded = True
+            if self.done:
+                self._unlink()
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Export generation history as a ZIP archive")
+    parser.add_argument("key", help="History list key in the state backend, e.g. history:<owner id>")
+    parser.add_argument("--format", choices=list(RENDERERS), default="md")
+    parser.add_argument("--start-date")
+    parser.add_argument("--end-date")
+    parser.add_argument("--service", action="append")
+    parser.add_argument("--industry", action="append")
+    parser.add_argument("--type", action="append")
+    parser.add_argument("--output", help="Archive path (default: stdout)")
+    args = parser.parse_args()
+
+    entries = filter_history(iter_history(args.key), args.start_date, args.end_date,
+                             args.service, args.industry, args.type)
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in stream_zip(entries, args.format):
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
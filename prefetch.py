@@ -0,0 +1,136 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Iterator, Optional, Tuple
+
+from state_backend import get_backend
+
+# --- Speculative Prefetch ---
+# When a rep's selection has been stable for PREFETCH_DEBOUNCE seconds the
+# matching generation is started in the background and lands in the shared
+# response cache, so the button click is usually a cache hit. Prefetches
+# still go through the budget and rate-limit checks in the caller's fn.
+# Every request, prefetched or clicked, registers in the in-flight registry
+# so the same request is never paid for twice at once.
+# Lives outside app.py because Streamlit re-executes the script module on
+# every rerun, which would reset the in-flight registry.
+
+PREFETCH_DEBOUNCE = float(os.environ.get('PREFETCH_DEBOUNCE', 1.5))
+PREFETCH_WAIT_TIMEOUT = float(os.environ.get('PREFETCH_WAIT_TIMEOUT', 60))
+
+_inflight: Dict[str, threading.Event] = {}
+_inflight_lock = threading.Lock()
+
+def _register(cache_key: str) -> Optional[threading.Event]:
+    """Claim `cache_key` if nobody else is running it"""
+    with _inflight_lock:
+        if cache_key in _inflight:
+            return None
+        event = _inflight[cache_key] = threading.Event()
+        return event
+
+def _release(cache_key: str, event: threading.Event):
+    with _inflight_lock:
+        if _inflight.get(cache_key) is event:
+            del _inflight[cache_key]
+    event.set()
+
+@contextmanager
+def inflight(cache_key: str, timeout: float = PREFETCH_WAIT_TIMEOUT) -> Iterator[None]:
+    """Run the body as the only holder of `cache_key`, first waiting for a
+    running prefetch of the same request so its cached result can be reused.
+    A holder that overruns `timeout` is no longer waited for."""
+    while True:
+        event = _register(cache_key)
+        if event:
+            break
+        with _inflight_lock:
+            running = _inflight.get(cache_key)
+        if running and not running.wait(timeout):
+            with _inflight_lock:
+                event = _inflight[cache_key] = threading.Event()
+            break
+    try:
+        yield
+    finally:
+        _release(cache_key, event)
+
+class Prefetcher:
+    """Debounced background runner for one selection slot (e.g. a tab),
+    keyed on the slot's own widget values. The first selection seen is the
+    page's default state, not a signal of intent, so it is remembered
+    without being prefetched; later changes are prefetched once they settle."""
+
+    def __init__(self, debounce: float = PREFETCH_DEBOUNCE):
+        self.debounce = debounce
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+        self._selection: Optional[Hashable] = None
+        self._seen = False
+
+    def schedule(self, selection: Hashable, cache_key: Optional[str] = None,
+                 fn: Optional[Callable[[], Optional[Tuple[int, float]]]] = None):
+        """Record the slot's current `selection`. fn runs the request for it
+        and returns the (tokens, cost in USD) it used, or None if it was
+        skipped; leave cache_key and fn out when the selection has nothing
+        to prefetch (e.g. a custom text field not filled in yet)."""
+        with self._lock:
+            if self._seen and selection == self._selection:
+                return
+            first = not self._seen
+            self._seen = True
+            self._selection = selection
+            self._cancel_timer()
+            if first or fn is None:
+                return
+            self._timer = threading.Timer(self.debounce, self._run, (cache_key, fn))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def cancel(self):
+        """Drop a pending prefetch, e.g. because the user clicked first"""
+        with self._lock:
+            self._cancel_timer()
+
+    def _cancel_timer(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+
+    def _run(self, cache_key: str, fn: Callable[[], Optional[Tuple[int, float]]]):
+        event = _register(cache_key)
+        if not event:
+            return
+        backend = get_backend()
+        try:
+            used = fn()
+            if used is None:
+                backend.incr("stats:prefetch_skipped")
+            else:
+                tokens, cost_micros = used[0], int(round(used[1] * 1_000_000))
+                backend.incr_many([("stats:prefetch_issued", 1, None), ("stats:prefetch_tokens", tokens, None),
+                                   ("stats:prefetch_cost_micros", cost_micros, None)])
+                backend.set(f"prefetch:{cache_key}", [tokens, cost_micros], ttl=24 * 3600)
+        except Exception:
+            backend.incr("stats:prefetch_errors")
+        finally:
+            _release(cache_key, event)
+
+def record_prefetch_hit(cache_key: str):
+    """Count a cache hit that was served by a prefetched response"""
+    backend = get_backend()
+    used = backend.get(f"prefetch:{cache_key}")
+    if used is not None and backend.incr(f"prefetch_used:{cache_key}", ttl=24 * 3600) == 1:
+        backend.incr_many([("stats:prefetch_hits", 1, None), ("stats:prefetch_used_tokens", used[0], None),
+                           ("stats:prefetch_used_cost_micros", used[1], None)])
+
+def prefetch_report() -> Dict:
+    backend = get_backend()
+    stats = {name: backend.get(f"stats:prefetch_{name}") or 0
+             for name in ("issued", "hits", "skipped", "errors", "tokens", "used_tokens",
+                          "cost_micros", "used_cost_micros")}
+    stats["hit_rate"] = stats["hits"] / stats["issued"] if stats["issued"] else 0.0
+    # Prompt and completion tokens of prefetches nobody clicked
+    stats["wasted_tokens"] = stats["tokens"] - stats["used_tokens"]
+    stats["wasted_cost_usd"] = (stats.pop("cost_micros") - stats.pop("used_cost_micros")) / 1_000_000
+    return stats
@@ -0,0 +1,164 @@
+import hashlib
+import importlib.util
+import os
+import subprocess
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# --- Startup: Lazy Clients and Background Warm-up ---
+# Heavy dependencies (openai, tiktoken, export libraries) are imported on
+# first use instead of at module load, and warm_up() pays those costs on a
+# background thread once per server process. Profile cold start with:
+#   python startup.py --target 3.0
+#   python startup.py --importtime
+
+def openai_available() -> bool:
+    return importlib.util.find_spec("openai") is not None
+
+# Least recently used clients are dropped past this many distinct keys
+CLIENT_CACHE_SIZE = int(os.environ.get('CLIENT_CACHE_SIZE', 16))
+
+# Keyed by a digest so raw API keys are only held by live clients
+_clients: "OrderedDict[str, object]" = OrderedDict()
+_clients_lock = threading.Lock()
+
+def _client_key(api_key: str, base_url: Optional[str]) -> str:
+    return hashlib.sha256(f"{api_key}\0{base_url or ''}".encode()).hexdigest()
+
+def get_client(api_key: str, base_url: Optional[str] = None):
+    """Process-wide OpenAI client per (key, base url), so reruns and
+    sessions reuse its connection pool"""
+    key = _client_key(api_key, base_url)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            from openai import OpenAI
+            client = _clients[key] = OpenAI(api_key=api_key, base_url=base_url)
+            while len(_clients) > CLIENT_CACHE_SIZE:
+                _clients.popitem(last=False)
+        else:
+            _clients.move_to_end(key)
+        return client
+
+def evict_client(api_key: str, base_url: Optional[str] = None):
+    """Forget the client for a key that is no longer in use"""
+    with _clients_lock:
+        _clients.pop(_client_key(api_key, base_url), None)
+
+_warm_up_started = False
+_warm_up_lock = threading.Lock()
+
+def _warm_up(api_key: Optional[str]):
+    from state_backend import get_backend
+    from usage_ledger import count_tokens
+    get_backend()
+    count_tokens("warm up")
+    if openai_available():
+        if api_key:
+            get_client(api_key, os.environ.get('OPENAI_BASE_URL') or None)
+        else:
+            import openai  # noqa: F401
+
+def warm_up(api_key: Optional[str] = None):
+    """Start the one-time background warm-up for this process"""
+    global _warm_up_started
+    with _warm_up_lock:
+        if _warm_up_started:
+            return
+        _warm_up_started = True
+    threading.Thread(target=_warm_up, args=(api_key,), daemon=True, name="warm-up").start()
+
+# --- Startup Profiler ---
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (component, statement); each is timed in a fresh interpreter so the
+# numbers are cold-start costs including the component's own imports
+PROFILE_COMPONENTS = [
+    ("import streamlit", "import streamlit"),
+    ("import openai", "import openai"),
+    ("import tiktoken", "import tiktoken"),
+    ("import docx", "import docx"),
+    ("import fpdf", "import fpdf"),
+    ("import catalog", "import catalog"),
+    ("import state_backend", "import state_backend"),
+    ("import usage_ledger", "import usage_ledger"),
+    ("import history_export", "import history_export"),
+    ("import prefetch", "import prefetch"),
+    ("import app", "import app"),
+    ("init state backend", "import state_backend; state_backend.get_backend()"),
+    ("init openai client", "import startup; startup.get_client('sk-profile')"),
+    ("token estimate", "import usage_ledger; usage_ledger.count_tokens('warm up')"),
+    ("first render", "from streamlit.testing.v1 import AppTest; AppTest.from_file('app.py', default_timeout=60).run()")
+]
+
+_TIMER = """
+import time
+_start = time.perf_counter()
+{statement}
+print(time.perf_counter() - _start)
+"""
+
+def profile_component(statement: str) -> Optional[float]:
+    """Seconds taken by `statement` in a fresh interpreter, or None if it failed"""
+    result = subprocess.run([sys.executable, "-c", _TIMER.format(statement=statement)],
+                            cwd=HERE, capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    return float(result.stdout.strip().splitlines()[-1])
+
+def profile_startup(repeat: int = 3) -> List[Dict]:
+    """Best-of-`repeat` cold time per component"""
+    rows = []
+    for name, statement in PROFILE_COMPONENTS:
+        samples = [profile_component(statement) for _ in range(repeat)]
+        ok = [s for s in samples if s is not None]
+        rows.append({"component": name, "seconds": round(min(ok), 4) if ok else None})
+    return rows
+
+def import_time_breakdown(module: str = "app", top: int = 15) -> List[Tuple[str, float]]:
+    """Slowest modules by cumulative import time (python -X importtime)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=HERE, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        rows.append((name.strip(), int(cumulative) / 1_000_000))
+    return sorted(rows, key=lambda r: r[1], reverse=True)[:top]
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Report cold-start import and initialization time per component")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh-interpreter runs per component (best is kept)")
+    parser.add_argument("--target", type=float, help="Fail if the cold first render exceeds this many seconds")
+    parser.add_argument("--importtime", action="store_true", help="Also list the slowest modules imported by app.py")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    rows = profile_startup(args.repeat)
+    by_name = {row["component"]: row["seconds"] for row in rows}
+    # A fresh first render includes importing streamlit, app.py and its dependencies
+    cold_start = by_name.get("first render")
+    breakdown = import_time_breakdown() if args.importtime else []
+
+    if args.json:
+        print(json.dumps({"components": rows, "cold_start_seconds": cold_start,
+                          "import_breakdown": [{"module": m, "seconds": s} for m, s in breakdown]}, indent=2))
+    else:
+        for row in rows:
+            seconds = f"{row['seconds'] * 1000:9.1f} ms" if row["seconds"] is not None else "  unavailable"
+            print(f"{row['component']:<24}{seconds}")
+        print(f"\n{'cold start (app)':<24}" + (f"{cold_start * 1000:9.1f} ms" if cold_start is not None else "  unavailable"))
+        if breakdown:
+            print("\nSlowest imports (cumulative):")
+            for module, seconds in breakdown:
+                print(f"  {module:<40}{seconds * 1000:9.1f} ms")
+
+    if args.target is not None and (cold_start is None or cold_start > args.target):
+        print(f"\nCold start target of {args.target}s not met", file=sys.stderr)
+        sys.exit(1)
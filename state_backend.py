@@ -0,0 +1,324 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, List, Optional, Tuple
+from urllib.parse import urlparse
+
+# --- Shared State Backends ---
+# Response caches, generation history and rate-limit counters live here
+# instead of st.session_state so several app replicas can share them.
+# Select with STATE_BACKEND:
+#   memory                    (default, per process)
+#   sqlite:///state.db        (single host, shared by all processes;
+#                              sqlite:////abs/path.db for absolute paths)
+#   redis://host:6379/0        (multi host, any Redis-protocol server)
+
+class StateBackend:
+    """Key/value store with TTLs, atomic counters and append-only lists.
+    Values are JSON-serializable."""
+
+    def get(self, key: str) -> Optional[Any]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int = 1, ttl: Optional[float] = None) -> int:
+        """Atomically add `amount`; `ttl` applies when the counter is created"""
+        raise NotImplementedError
+
+    def incr_many(self, items: List[Tuple[str, int, Optional[float]]]) -> List[int]:
+        """incr() for several (key, amount, ttl) items in one round trip"""
+        return [self.incr(key, amount, ttl) for key, amount, ttl in items]
+
+    def append(self, key: str, value: Any):
+        raise NotImplementedError
+
+    def list_range(self, key: str, start: int = 0, end: int = -1) -> List[Any]:
+        """Items start..end inclusive, negative indexes count from the end"""
+        raise NotImplementedError
+
+# Expired keys that are never read again (old rate-limit windows, stale
+# cache entries) are swept at most this often
+PURGE_INTERVAL = 60
+
+def _slice(items: List, start: int, end: int) -> List:
+    return items[start:] if end == -1 else items[start:end + 1]
+
+class MemoryBackend(StateBackend):
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}
+        self._lists = {}
+        self._last_purge = time.time()
+
+    def _purge_expired(self):
+        now = time.time()
+        if now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        for key in [k for k, (_, expires) in self._values.items() if expires is not None and expires <= now]:
+            del self._values[key]
+
+    def _live(self, key: str):
+        entry = self._values.get(key)
+        if entry and entry[1] is not None and entry[1] <= time.time():
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._live(key)
+            return entry[0] if entry else None
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._purge_expired()
+            self._values[key] = (value, time.time() + ttl if ttl else None)
+
+    def _incr(self, key, amount, ttl):
+        entry = self._live(key)
+        if entry:
+            value, expires = entry[0] + amount, entry[1]
+        else:
+            value, expires = amount, (time.time() + ttl if ttl else None)
+        self._values[key] = (value, expires)
+        return value
+
+    def incr(self, key, amount=1, ttl=None):
+        with self._lock:
+            self._purge_expired()
+            return self._incr(key, amount, ttl)
+
+    def incr_many(self, items):
+        with self._lock:
+            self._purge_expired()
+            return [self._incr(key, amount, ttl) for key, amount, ttl in items]
+
+    def append(self, key, value):
+        with self._lock:
+            self._lists.setdefault(key, []).append(value)
+
+    def list_range(self, key, start=0, end=-1):
+        with self._lock:
+            # Slicing copies only the requested page
+            return _slice(self._lists.get(key, []), start, end)
+
+class SQLiteBackend(StateBackend):
+    def __init__(self, path: str):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT, expires_at REAL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS lists (id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT, value TEXT)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS lists_key ON lists (key, id)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS kv_expires ON kv (expires_at)")
+        self._last_purge = 0.0
+
+    def _purge_expired(self, now: float):
+        """Called with the lock held"""
+        if now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        self._conn.execute("DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        with self._lock:
+            self._purge_expired(now)
+            self._conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)",
+                               (key, json.dumps(value), now + ttl if ttl else None))
+
+    def incr(self, key, amount=1, ttl=None):
+        return self.incr_many([(key, amount, ttl)])[0]
+
+    def incr_many(self, items):
+        now = time.time()
+        values = []
+        with self._lock:
+            self._purge_expired(now)
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, amount, ttl in items:
+                    row = self._conn.execute(
+                        "SELECT value, expires_at FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                        (key, now)).fetchone()
+                    if row:
+                        value, expires = json.loads(row[0]) + amount, row[1]
+                    else:
+                        value, expires = amount, (now + ttl if ttl else None)
+                    self._conn.execute("INSERT OR REPLACE INTO kv VALUES (?, ?, ?)", (key, json.dumps(value), expires))
+                    values.append(value)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return values
+
+    def append(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT INTO lists (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+    def list_range(self, key, start=0, end=-1):
+        with self._lock:
+            if start >= 0 and end >= start:
+                # Page in SQL so callers walking a long list don't load all of it
+                rows = self._conn.execute("SELECT value FROM lists WHERE key = ? ORDER BY id LIMIT ? OFFSET ?",
+                                          (key, end - start + 1, start)).fetchall()
+            else:
+                rows = _slice(self._conn.execute("SELECT value FROM lists WHERE key = ? ORDER BY id",
+                                                 (key,)).fetchall(), start, end)
+        return [json.loads(r[0]) for r in rows]
+
+class RedisBackend(StateBackend):
+    """Speaks RESP directly over a socket, so no redis client package is needed"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, db: int = 0,
+                 password: Optional[str] = None, prefix: str = "salespitch:"):
+        self._lock = threading.Lock()
+        self._address = (host, port)
+        self._db = db
+        self._password = password
+        self._prefix = prefix
+        self._sock = None
+        self._file = None
+
+    def _connect(self):
+        self._sock = socket.create_connection(self._address, timeout=10)
+        self._file = self._sock.makefile("rb")
+        if self._password:
+            self._send("AUTH", self._password)
+        if self._db:
+            self._send("SELECT", self._db)
+
+    @staticmethod
+    def _encode(args) -> bytes:
+        parts = [f"*{len(args)}\r\n".encode()]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+        return b"".join(parts)
+
+    def _send(self, *args):
+        self._sock.sendall(self._encode(args))
+        return self._read()
+
+    def _read(self):
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Redis connection closed")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(f"Redis error: {rest.decode()}")
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            size = int(rest)
+            if size < 0:
+                return None
+            data = self._file.read(size + 2)[:-2]
+            return data.decode()
+        if kind == b"*":
+            size = int(rest)
+            return None if size < 0 else [self._read() for _ in range(size)]
+        raise RuntimeError(f"Unexpected Redis reply: {line!r}")
+
+    def pipeline(self, commands: List[tuple]) -> List[Any]:
+        """Send several commands in one write and read all the replies. Only
+        connecting is retried: once sent, commands like INCRBY must not be
+        replayed."""
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    break
+                except (ConnectionError, OSError):
+                    self._sock = None
+                    if attempt:
+                        raise
+            try:
+                self._sock.sendall(b"".join(self._encode(args) for args in commands))
+                replies, error = [], None
+                for _ in commands:
+                    # Read every reply even after an error so the stream stays in sync
+                    try:
+                        replies.append(self._read())
+                    except RuntimeError as e:
+                        replies.append(None)
+                        error = error or e
+            except (ConnectionError, OSError):
+                self._sock = None
+                raise
+        if error:
+            raise error
+        return replies
+
+    def command(self, *args):
+        return self.pipeline([args])[0]
+
+    def get(self, key):
+        raw = self.command("GET", self._prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        if ttl:
+            self.command("SET", self._prefix + key, json.dumps(value), "PX", int(ttl * 1000))
+        else:
+            self.command("SET", self._prefix + key, json.dumps(value))
+
+    def incr(self, key, amount=1, ttl=None):
+        return self.incr_many([(key, amount, ttl)])[0]
+
+    def incr_many(self, items):
+        commands = []
+        for key, amount, ttl in items:
+            if ttl:
+                # Create the counter with its expiry first; INCRBY keeps the TTL
+                commands.append(("SET", self._prefix + key, 0, "PX", int(ttl * 1000), "NX"))
+            commands.append(("INCRBY", self._prefix + key, amount))
+        replies = self.pipeline(commands)
+        return [r for (cmd, *_), r in zip(commands, replies) if cmd == "INCRBY"]
+
+    def append(self, key, value):
+        self.command("RPUSH", self._prefix + key, json.dumps(value))
+
+    def list_range(self, key, start=0, end=-1):
+        return [json.loads(v) for v in self.command("LRANGE", self._prefix + key, start, end)]
+
+def create_backend(url: str) -> StateBackend:
+    """Build a backend from a STATE_BACKEND url"""
+    parsed = urlparse(url or "memory")
+    scheme = parsed.scheme or parsed.path
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme == "sqlite":
+        return SQLiteBackend(parsed.path[1:] or "salespitch_state.db")
+    if scheme == "redis":
+        db = int(parsed.path.lstrip("/") or 0)
+        return RedisBackend(parsed.hostname or "127.0.0.1", parsed.port or 6379, db, parsed.password)
+    raise ValueError(f"Unknown STATE_BACKEND: {url}")
+
+_backend: Optional[StateBackend] = None
+_backend_lock = threading.Lock()
+
+def get_backend() -> StateBackend:
+    """Process-wide backend configured by the STATE_BACKEND environment variable"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(os.environ.get("STATE_BACKEND", "memory"))
+        return _backend
@@ -0,0 +1,190 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+# --- Stub Chat Completions Server ---
+# A local stand-in for the OpenAI chat-completions endpoint, used by the
+# benchmark suite so the app can be measured without hitting the real API.
+
+DEFAULT_STUB_CONFIG = {
+    "latency": 0.05,            # seconds before the first token
+    "token_rate": 500.0,        # completion tokens per second (0 = instant)
+    "completion_tokens": 300,   # tokens returned when max_tokens allows it
+    "error_rate": 0.0,          # probability of an injected error response
+    "error_status": 500,        # status code used for injected errors
+    "seed": None
+}
+
+FILLER_WORDS = ["our", "AI", "solution", "delivers", "measurable", "ROI", "for", "your", "team",
+                "by", "automating", "manual", "workflows", "and", "reducing", "costs"]
+
+def count_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) used by the stub"""
+    return max(1, len(text) // 4)
+
+def _completion_text(n_tokens: int, json_mode: bool) -> str:
+    words = [FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(n_tokens)]
+    if not json_mode:
+        return " ".join(words)
+    third = max(1, n_tokens // 4)
+    return json.dumps({
+        "empathetic": " ".join(words[:third]),
+        "logic": " ".join(words[third:2 * third]),
+        "story": " ".join(words[2 * third:3 * third]),
+        "handling_tips": [f"Tip {i}: " + " ".join(words[:5]) for i in range(1, 6)]
+    })
+
+class StubStats:
+    """Thread-safe counters describing the traffic the stub has served"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+
+    def record(self, prompt_tokens: int = 0, completion_tokens: int = 0, error: bool = False):
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens
+            }
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "invalid_request_error"}})
+            return
+
+        length = int(self.headers.get("Content-Length", 0))
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"error": {"message": "Invalid JSON body", "type": "invalid_request_error"}})
+            return
+
+        config = self.server.config
+        stats = self.server.stats
+        messages: List[Dict] = request.get("messages", [])
+        prompt_tokens = sum(count_tokens(str(m.get("content", ""))) for m in messages)
+
+        time.sleep(config["latency"])
+        if config["error_rate"] and self.server.rng.random() < config["error_rate"]:
+            stats.record(prompt_tokens=prompt_tokens, error=True)
+            self._send_json(config["error_status"], {"error": {"message": "Injected stub error", "type": "server_error"}})
+            return
+
+        n_tokens = min(request.get("max_tokens") or config["completion_tokens"], config["completion_tokens"])
+        json_mode = (request.get("response_format") or {}).get("type") == "json_object"
+        text = _completion_text(n_tokens, json_mode)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": n_tokens, "total_tokens": prompt_tokens + n_tokens}
+        base = {"id": f"chatcmpl-stub-{stats.requests}", "created": int(time.time()), "model": request.get("model", "stub")}
+
+        if request.get("stream"):
+            self._stream(base, text, n_tokens, usage)
+        else:
+            if config["token_rate"]:
+                time.sleep(n_tokens / config["token_rate"])
+            self._send_json(200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage
+            })
+        stats.record(prompt_tokens=prompt_tokens, completion_tokens=n_tokens)
+
+    def _stream(self, base: Dict, text: str, n_tokens: int, usage: Dict):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+
+        pieces = [text[i:i + 16] for i in range(0, len(text), 16)] or [""]
+        delay = (n_tokens / self.server.config["token_rate"]) / len(pieces) if self.server.config["token_rate"] else 0
+        for i, piece in enumerate(pieces):
+            delta = {"role": "assistant", "content": piece} if i == 0 else {"content": piece}
+            self._event({**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+            if delay:
+                time.sleep(delay)
+        self._event({**base, "object": "chat.completion.chunk",
+                     "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+    def _event(self, payload: Dict):
+        self.wfile.write(f"data: {json.dumps(payload)}\n\n".encode())
+        self.wfile.flush()
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: Dict):
+        super().__init__(address, StubHandler)
+        self.config = config
+        self.stats = StubStats()
+        self.rng = random.Random(config.get("seed"))
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+def start_stub_server(host: str = "127.0.0.1", port: int = 0, **overrides) -> StubServer:
+    """Start the stub server on a background thread; port 0 picks a free port"""
+    unknown = set(overrides) - set(DEFAULT_STUB_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown stub options: {', '.join(sorted(unknown))}")
+    server = StubServer((host, port), {**DEFAULT_STUB_CONFIG, **overrides})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stub OpenAI chat-completions server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency", type=float, default=DEFAULT_STUB_CONFIG["latency"])
+    parser.add_argument("--token-rate", type=float, default=DEFAULT_STUB_CONFIG["token_rate"])
+    parser.add_argument("--completion-tokens", type=int, default=DEFAULT_STUB_CONFIG["completion_tokens"])
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_STUB_CONFIG["error_rate"])
+    parser.add_argument("--error-status", type=int, default=DEFAULT_STUB_CONFIG["error_status"])
+    args = parser.parse_args()
+
+    server = start_stub_server(args.host, args.port, latency=args.latency, token_rate=args.token_rate,
+                               completion_tokens=args.completion_tokens, error_rate=args.error_rate,
+                               error_status=args.error_status)
+    print(f"Stub OpenAI server at {server.base_url} (set OPENAI_BASE_URL to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
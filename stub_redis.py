@@ -0,0 +1,131 @@
+import socketserver
+import threading
+import time
+from typing import Dict, List
+
+# --- Stub Redis Server ---
+# A local stand-in speaking the subset of RESP used by RedisBackend
+# (GET, SET [PX] [NX], INCRBY, PEXPIRE, RPUSH, LRANGE, DEL, PING, AUTH, SELECT),
+# so the shared-state backend can be exercised without a real Redis.
+
+class _Store:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values: Dict[bytes, bytes] = {}
+        self.lists: Dict[bytes, List[bytes]] = {}
+        self.expires: Dict[bytes, float] = {}
+
+    def expire_stale(self, key: bytes):
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.values.pop(key, None)
+            self.lists.pop(key, None)
+            self.expires.pop(key, None)
+
+def _bulk(value) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+class StubRedisHandler(socketserver.StreamRequestHandler):
+    def _read_command(self):
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            size = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(size + 2)[:-2])
+        return args
+
+    def handle(self):
+        store: _Store = self.server.store
+        while True:
+            args = self._read_command()
+            if not args:
+                return
+            with store.lock:
+                reply = self._execute(store, args[0].upper(), args[1:])
+            self.wfile.write(reply)
+
+    def _execute(self, store: _Store, cmd: bytes, args: List[bytes]) -> bytes:
+        if args:
+            store.expire_stale(args[0])
+        if cmd in (b"PING", b"AUTH", b"SELECT"):
+            return b"+PONG\r\n" if cmd == b"PING" else b"+OK\r\n"
+        if cmd == b"GET":
+            return _bulk(store.values.get(args[0]))
+        if cmd == b"SET":
+            options = [a.upper() for a in args[2:]]
+            if b"NX" in options and args[0] in store.values:
+                return _bulk(None)
+            store.values[args[0]] = args[1]
+            store.expires.pop(args[0], None)
+            if b"PX" in options:
+                store.expires[args[0]] = time.time() + int(args[2 + options.index(b"PX") + 1]) / 1000
+            return b"+OK\r\n"
+        if cmd == b"INCRBY":
+            try:
+                value = int(store.values.get(args[0], b"0")) + int(args[1])
+            except ValueError:
+                return b"-ERR value is not an integer or out of range\r\n"
+            store.values[args[0]] = str(value).encode()
+            return b":%d\r\n" % value
+        if cmd == b"PEXPIRE":
+            exists = args[0] in store.values or args[0] in store.lists
+            if exists:
+                store.expires[args[0]] = time.time() + int(args[1]) / 1000
+            return b":%d\r\n" % int(exists)
+        if cmd == b"RPUSH":
+            items = store.lists.setdefault(args[0], [])
+            items.extend(args[1:])
+            return b":%d\r\n" % len(items)
+        if cmd == b"LRANGE":
+            items = store.lists.get(args[0], [])
+            start, end = int(args[1]), int(args[2])
+            selected = items[start:] if end == -1 else items[start:end + 1]
+            return b"*%d\r\n" % len(selected) + b"".join(_bulk(v) for v in selected)
+        if cmd == b"DEL":
+            removed = 0
+            for key in args:
+                removed += int(store.values.pop(key, None) is not None or store.lists.pop(key, None) is not None)
+                store.expires.pop(key, None)
+            return b":%d\r\n" % removed
+        return b"-ERR unknown command '%s'\r\n" % cmd
+
+class StubRedisServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, StubRedisHandler)
+        self.store = _Store()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+def start_stub_redis(host: str = "127.0.0.1", port: int = 0) -> StubRedisServer:
+    """Start the stub server on a background thread; port 0 picks a free port"""
+    server = StubRedisServer((host, port))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stub Redis server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    args = parser.parse_args()
+
+    server = start_stub_redis(args.host, args.port)
+    print(f"Stub Redis server at {server.url} (set STATE_BACKEND to use it)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
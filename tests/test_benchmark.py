@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from benchmark import compare, summarize
+from stub_openai import start_stub_server
+
+openai = pytest.importorskip("openai")
+
+@pytest.fixture
+def stub():
+    servers = []
+
+    def start(**options):
+        server = start_stub_server(latency=0, token_rate=0, completion_tokens=40, **options)
+        servers.append(server)
+        return server, openai.OpenAI(api_key="stub", base_url=server.base_url, max_retries=0)
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+MESSAGES = [{"role": "user", "content": "Generate a personalized sales pitch."}]
+
+def test_stub_json_mode_round_trip(stub):
+    server, client = stub()
+    response = client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES, max_tokens=1200,
+                                              response_format={"type": "json_object"})
+    data = json.loads(response.choices[0].message.content)
+    assert set(data) == {"empathetic", "logic", "story", "handling_tips"}
+    assert response.usage.completion_tokens == 40
+    assert server.stats.snapshot()["requests"] == 1
+
+def test_stub_streaming_round_trip(stub):
+    server, client = stub()
+    chunks = list(client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES, max_tokens=10, stream=True))
+    text = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+    assert len(text.split()) == 10
+    assert chunks[-1].usage.completion_tokens == 10
+
+def test_stub_error_injection(stub):
+    server, client = stub(error_rate=1.0, error_status=503)
+    with pytest.raises(openai.APIStatusError) as raised:
+        client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES)
+    assert raised.value.status_code == 503
+    assert server.stats.snapshot()["errors"] == 1
+
+def test_compare_flags_regressions():
+    baseline = {"results": {"batch": {"workers_4": {**summarize([0.1] * 10), "throughput_rps": 40.0},
+                                      "workers_8": {**summarize([0.1] * 10), "throughput_rps": 80.0}},
+                            "render": {"generate_pitch": {**summarize([0.2] * 5), "stub_errors": 0}}}}
+    report = {"results": {"batch": {"workers_4": {**summarize([0.2] * 10, errors=2), "throughput_rps": 20.0},
+                                    "workers_8": {**summarize([0.105] * 10), "throughput_rps": 78.0}},
+                          "render": {"generate_pitch": {**summarize([0.2] * 5), "stub_errors": 3}}}}
+    assert compare(report, baseline, tolerance=0.2) == [
+        "batch.workers_4: errors 0 -> 2",
+        "batch.workers_4: p95 100.0ms -> 200.0ms",
+        "batch.workers_4: throughput 40.0 -> 20.0 rps",
+        "render.generate_pitch: stub_errors 0 -> 3"
+    ]
+    assert compare(baseline, baseline, tolerance=0.2) == []
@@ -0,0 +1,13 @@
+import catalog
+
+def test_indexes_follow_catalog():
+    assert catalog.SERVICE_NAMES == list(catalog.SERVICES)
+    assert catalog.OBJECTION_CATEGORIES == list(catalog.OBJECTIONS)
+    assert all(isinstance(items, list) for items in catalog.OBJECTIONS.values())
+    assert catalog.INDUSTRY_PAIN_POINTS["Healthcare"] == [
+        "administrative burden", "scheduling", "patient communication", "billing compliance"]
+    assert catalog.HISTORY_TYPES == ["Pitch", "Objection"] + list(catalog.SCRIPT_TEMPLATES)
+
+def test_objection_prompt_names_response_keys():
+    prompt = catalog.SYSTEM_PROMPTS["objection_handler"]
+    assert all(key in prompt for key in ("empathetic", "logic", "story", "handling_tips"))
@@ -0,0 +1,69 @@
+import io
+import time
+import zipfile
+
+import pytest
+
+import state_backend
+from history_export import DOCX_AVAILABLE, PDF_AVAILABLE, ExportJob, iter_history, stream_zip, to_docx, to_pdf
+from state_backend import MemoryBackend
+
+PITCH = {
+    "timestamp": "2026-10-01 09:30:00",
+    "type": "Sales Pitch",
+    "service": "AI Chatbots",
+    "industry": "Healthcare",
+    "tone": "Professional",
+    "content": "Opening line that is long enough to wrap across the page. " * 20 + "\n\nClosing 🚀"
+}
+OBJECTION = {
+    "timestamp": "2026-10-02 14:00:00",
+    "type": "Objection Response",
+    "service": "AI Chatbots",
+    "objection": "It's too expensive",
+    "content": {
+        "empathetic": "I understand budget matters.",
+        "logic": "The tool pays for itself within a quarter.",
+        "story": "A clinic like yours cut no-shows by 30%.",
+        "handling_tips": ["Acknowledge", "Quantify ROI"]
+    }
+}
+
+@pytest.mark.skipif(not PDF_AVAILABLE, reason="fpdf2 not installed")
+@pytest.mark.parametrize("entry", [PITCH, OBJECTION])
+def test_to_pdf_renders(entry):
+    assert to_pdf(entry).startswith(b"%PDF")
+
+@pytest.mark.skipif(not DOCX_AVAILABLE, reason="python-docx not installed")
+@pytest.mark.parametrize("entry", [PITCH, OBJECTION])
+def test_to_docx_renders(entry):
+    import docx
+    text = "\n".join(p.text for p in docx.Document(io.BytesIO(to_docx(entry))).paragraphs)
+    assert entry["type"] in text
+    assert "Quantify ROI" in text if entry is OBJECTION else "Closing" in text
+
+def test_stream_zip_and_paged_history(monkeypatch):
+    backend = MemoryBackend()
+    monkeypatch.setattr(state_backend, "_backend", backend)
+    for _ in range(5):
+        backend.append("history:test", PITCH)
+    entries = list(iter_history("history:test", page_size=2))
+    assert len(entries) == 5
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(stream_zip(entries, "md", chunk_size=256))))
+    assert len(archive.namelist()) == 5
+
+def _wait(job):
+    while not job.done:
+        time.sleep(0.01)
+
+def test_export_job_removes_temp_files():
+    job = ExportJob([PITCH], "md")
+    _wait(job)
+    assert zipfile.ZipFile(io.BytesIO(job.read())).namelist()
+    job.cleanup()
+    with pytest.raises(FileNotFoundError):
+        job.read()
+    empty = ExportJob([], "md")
+    _wait(empty)
+    with pytest.raises(FileNotFoundError):
+        empty.read()
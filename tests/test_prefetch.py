@@ -0,0 +1,74 @@
+import threading
+import time
+
+import pytest
+
+import prefetch
+import state_backend
+from prefetch import Prefetcher, inflight, prefetch_report, record_prefetch_hit
+from state_backend import MemoryBackend
+
+@pytest.fixture(autouse=True)
+def backend(monkeypatch):
+    backend = MemoryBackend()
+    monkeypatch.setattr(state_backend, "_backend", backend)
+    return backend
+
+def test_click_during_debounce_cancels_prefetch():
+    calls = []
+    prefetcher = Prefetcher(debounce=0.05)
+    prefetcher.schedule(("default",), "cache:default", lambda: calls.append("default"))
+    prefetcher.schedule(("a",), "cache:a", lambda: calls.append("prefetch") or (10, 0.001))
+    prefetcher.cancel()
+    with inflight("cache:a"):
+        calls.append("click")
+    time.sleep(0.1)
+    assert calls == ["click"]
+
+def test_prefetch_skips_request_already_in_flight():
+    calls = []
+    prefetcher = Prefetcher(debounce=0.01)
+    prefetcher.schedule(("default",))
+    with inflight("cache:a"):
+        prefetcher.schedule(("a",), "cache:a", lambda: calls.append("prefetch") or (10, 0.001))
+        time.sleep(0.05)
+    assert calls == []
+    assert not prefetch._inflight
+
+def test_click_waits_for_running_prefetch_and_counts_hit():
+    started, finish = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        finish.wait(1)
+        return 120, 0.002
+
+    prefetcher = Prefetcher(debounce=0)
+    prefetcher.schedule(("default",))
+    prefetcher.schedule(("a",), "cache:a", slow)
+    started.wait(1)
+    threading.Timer(0.05, finish.set).start()
+    begun = time.time()
+    with inflight("cache:a"):
+        assert time.time() - begun >= 0.04
+        record_prefetch_hit("cache:a")
+    stats = prefetch_report()
+    assert (stats["issued"], stats["hits"], stats["wasted_tokens"], stats["wasted_cost_usd"]) == (1, 1, 0, 0)
+
+def test_first_pick_after_empty_default_is_prefetched():
+    calls = []
+    prefetcher = Prefetcher(debounce=0.01)
+    # The slot opens on a selection with nothing to prefetch
+    prefetcher.schedule(("Custom",))
+    prefetcher.schedule(("It's too expensive",), "cache:a", lambda: calls.append("a") or (10, 0.001))
+    time.sleep(0.05)
+    assert calls == ["a"]
+
+def test_unchanged_selection_is_not_rescheduled():
+    calls = []
+    prefetcher = Prefetcher(debounce=0.01)
+    prefetcher.schedule(("Cold Call Opening",), "cache:default", lambda: calls.append("default"))
+    # e.g. a model or temperature change alters the request but not the slot's selection
+    prefetcher.schedule(("Cold Call Opening",), "cache:other-model", lambda: calls.append("other"))
+    time.sleep(0.05)
+    assert calls == []
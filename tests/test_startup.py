@@ -0,0 +1,27 @@
+import pytest
+
+import startup
+
+pytest.importorskip("openai")
+
+@pytest.fixture(autouse=True)
+def clients(monkeypatch):
+    monkeypatch.setattr(startup, "_clients", startup.OrderedDict())
+    monkeypatch.setattr(startup, "CLIENT_CACHE_SIZE", 2)
+
+def test_clients_are_reused_and_bounded():
+    first = startup.get_client("sk-one")
+    assert startup.get_client("sk-one") is first
+    startup.get_client("sk-two")
+    startup.get_client("sk-one")
+    startup.get_client("sk-three")
+    # sk-two was least recently used
+    assert len(startup._clients) == 2
+    assert startup._client_key("sk-two", None) not in startup._clients
+    assert all("sk-" not in key for key in startup._clients)
+
+def test_evict_client():
+    first = startup.get_client("sk-one")
+    startup.evict_client("sk-one")
+    assert not startup._clients
+    assert startup.get_client("sk-one") is not first
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+import state_backend
+from state_backend import MemoryBackend, SQLiteBackend, create_backend
+from stub_redis import start_stub_redis
+
+@pytest.fixture(scope="module")
+def redis_server():
+    server = start_stub_redis()
+    yield server
+    server.shutdown()
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend()
+    if request.param == "sqlite":
+        return create_backend(f"sqlite:///{tmp_path / 'state.db'}")
+    server = request.getfixturevalue("redis_server")
+    # A fresh key prefix per test keeps the shared stub isolated
+    backend = create_backend(server.url)
+    backend._prefix = f"test:{request.node.name}:"
+    return backend
+
+def test_get_set_roundtrip(backend):
+    assert backend.get("missing") is None
+    backend.set("value", {"text": "hello", "n": [1, 2]})
+    assert backend.get("value") == {"text": "hello", "n": [1, 2]}
+    backend.set("value", "replaced")
+    assert backend.get("value") == "replaced"
+
+def test_set_ttl_expires(backend):
+    backend.set("short", 1, ttl=0.05)
+    assert backend.get("short") == 1
+    time.sleep(0.1)
+    assert backend.get("short") is None
+
+def test_incr_counts_and_keeps_first_ttl(backend):
+    assert backend.incr("counter", ttl=0.1) == 1
+    assert backend.incr("counter", 5, ttl=10) == 6
+    assert backend.get("counter") == 6
+    time.sleep(0.15)
+    assert backend.get("counter") is None
+    assert backend.incr("counter") == 1
+
+def test_incr_many_matches_incr(backend):
+    backend.incr("a", 2)
+    assert backend.incr_many([("a", 3, None), ("b", 1, 0.1), ("a", -1, None)]) == [5, 1, 4]
+    assert backend.incr_many([]) == []
+    time.sleep(0.15)
+    assert backend.get("a") == 4
+    assert backend.get("b") is None
+
+def test_list_append_and_range(backend):
+    for i in range(5):
+        backend.append("items", {"i": i})
+    assert [x["i"] for x in backend.list_range("items")] == [0, 1, 2, 3, 4]
+    assert [x["i"] for x in backend.list_range("items", 1, 2)] == [1, 2]
+    assert [x["i"] for x in backend.list_range("items", 3, 10)] == [3, 4]
+    assert [x["i"] for x in backend.list_range("items", -2, -1)] == [3, 4]
+    assert backend.list_range("items", 5, 9) == []
+    assert backend.list_range("missing") == []
+
+def test_sqlite_purges_expired_rows(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_backend, "PURGE_INTERVAL", 0)
+    backend = SQLiteBackend(str(tmp_path / "state.db"))
+    backend.set("stale", 1, ttl=0.01)
+    backend.incr("ratelimit:old", ttl=0.01)
+    time.sleep(0.05)
+    backend.set("fresh", 2)
+    keys = [row[0] for row in backend._conn.execute("SELECT key FROM kv")]
+    assert keys == ["fresh"]
+
+def test_memory_purges_expired_keys(monkeypatch):
+    monkeypatch.setattr(state_backend, "PURGE_INTERVAL", 0)
+    backend = MemoryBackend()
+    backend.incr("ratelimit:old", ttl=0.01)
+    time.sleep(0.05)
+    backend.set("fresh", 2)
+    assert list(backend._values) == ["fresh"]
@@ -0,0 +1,70 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import state_backend
+import usage_ledger
+from state_backend import MemoryBackend
+from usage_ledger import BudgetExceeded, record_usage, reserve_budget, settle_budget, usage_report
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = MemoryBackend()
+    monkeypatch.setattr(state_backend, "_backend", backend)
+    return backend
+
+def test_record_usage_aggregates_and_expires(backend):
+    record_usage("owner", "s1", "Pitch", "gpt-4o-mini", 1000, 500)
+    record_usage("owner", "s2", "Pitch", "gpt-4o-mini", 1000, 500)
+    [row] = usage_report("owner")
+    assert row["requests"] == 2 and row["prompt_tokens"] == 2000
+    assert row["cost_usd"] == pytest.approx(2 * usage_ledger.cost_usd("gpt-4o-mini", 1000, 500))
+    assert [r["session"] for r in usage_report("session", usage_ledger._periods()["day"])] == ["s1", "s2"]
+    # Every counter carries an expiry and no raw log is kept by default
+    assert all(expires is not None for _, expires in backend._values.values())
+    assert "usage:log" not in backend._lists
+
+def test_reservation_is_settled_to_actual_cost(backend, monkeypatch):
+    monkeypatch.setattr(usage_ledger, "DAILY_BUDGET_USD", 1.0)
+    reservation, warning = reserve_budget("owner", 0.5)
+    assert warning is None
+    day = usage_ledger._periods()["day"]
+    assert backend.get(f"budget:{day}:owner") == 500_000
+    settle_budget(reservation, 0.1)
+    assert backend.get(f"budget:{day}:owner") == 100_000
+
+def test_concurrent_reservations_cannot_overspend(backend, monkeypatch):
+    monkeypatch.setattr(usage_ledger, "DAILY_BUDGET_USD", 1.0)
+
+    def attempt(_):
+        try:
+            return reserve_budget("owner", 0.3)
+        except BudgetExceeded:
+            return None
+
+    with ThreadPoolExecutor(8) as pool:
+        granted = [r for r in pool.map(attempt, range(8)) if r]
+    assert len(granted) == 3
+    day = usage_ledger._periods()["day"]
+    assert backend.get(f"budget:{day}:owner") == 900_000
+
+def test_failed_month_check_releases_day_reservation(backend, monkeypatch):
+    monkeypatch.setattr(usage_ledger, "DAILY_BUDGET_USD", 1.0)
+    monkeypatch.setattr(usage_ledger, "MONTHLY_BUDGET_USD", 0.2)
+    with pytest.raises(BudgetExceeded):
+        reserve_budget("owner", 0.3)
+    periods = usage_ledger._periods()
+    assert backend.get(f"budget:{periods['day']}:owner") == 0
+    assert backend.get(f"budget:{periods['month']}:owner") == 0
+
+def test_user_budget_isolates_shared_key_sessions(backend, monkeypatch):
+    monkeypatch.setattr(usage_ledger, "DAILY_BUDGET_USD", 10.0)
+    monkeypatch.setattr(usage_ledger, "USER_DAILY_BUDGET_USD", 1.0)
+    reserve_budget("shared", 0.8, user="session:a")
+    with pytest.raises(BudgetExceeded):
+        reserve_budget("shared", 0.3, user="session:a")
+    reserve_budget("shared", 0.8, user="session:b")
+    day = usage_ledger._periods()["day"]
+    assert backend.get(f"budget:{day}:shared") == 1_600_000
+    # A user of their own key is bound by the key budget only
+    reserve_budget("own", 5.0, user="own")
@@ -0,0 +1,191 @@
+import importlib.util
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from state_backend import get_backend
+
+# --- Usage Ledger ---
+# Records actual token usage and estimated cost per API key, session, task
+# and model, pre-aggregated into day/month counters in the shared backend
+# so reports never scan a raw log. Budgets (USD, 0 = unlimited):
+#   DAILY_BUDGET_USD, MONTHLY_BUDGET_USD            per API key
+#   USER_DAILY_BUDGET_USD, USER_MONTHLY_BUDGET_USD  per user of a shared key,
+#       so one session on OPENAI_API_KEY cannot exhaust it for everybody
+#   BUDGET_WARN_RATIO                               soft warning threshold (0.8)
+# Budgets are enforced by reserving each request's worst-case cost with an
+# atomic increment before it is sent, then settling to the actual cost, so
+# concurrent requests cannot jointly overspend. Set USAGE_LOG=1 to also
+# keep a raw per-request log (unbounded; off by default).
+
+# tiktoken is optional and slow to import, so it is loaded on first use
+TIKTOKEN_AVAILABLE = importlib.util.find_spec("tiktoken") is not None
+
+# USD per 1M tokens (input, output)
+MODEL_PRICING = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-3.5-turbo": (0.50, 1.50)
+}
+DEFAULT_PRICING = MODEL_PRICING["gpt-4o"]
+
+DAILY_BUDGET_USD = float(os.environ.get('DAILY_BUDGET_USD', 0))
+MONTHLY_BUDGET_USD = float(os.environ.get('MONTHLY_BUDGET_USD', 0))
+USER_DAILY_BUDGET_USD = float(os.environ.get('USER_DAILY_BUDGET_USD', 0))
+USER_MONTHLY_BUDGET_USD = float(os.environ.get('USER_MONTHLY_BUDGET_USD', 0))
+BUDGET_WARN_RATIO = float(os.environ.get('BUDGET_WARN_RATIO', 0.8))
+USAGE_LOG = os.environ.get('USAGE_LOG', '').lower() in ('1', 'true', 'yes')
+
+# How long counters outlive their period
+PERIOD_TTLS = {
+    "day": 40 * 24 * 3600,
+    "month": 400 * 24 * 3600
+}
+
+DIMENSIONS = ["owner", "session", "task", "model"]
+METRICS = ["requests", "prompt_tokens", "completion_tokens", "cost_micros"]
+# Per-message overhead the chat format adds on top of the content tokens
+MESSAGE_OVERHEAD_TOKENS = 4
+
+class BudgetExceeded(Exception):
+    pass
+
+@lru_cache(maxsize=None)
+def _encoding(model: str):
+    import tiktoken
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    if TIKTOKEN_AVAILABLE:
+        return len(_encoding(model).encode(text))
+    return max(1, len(text) // 4)
+
+def cost_usd(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = MODEL_PRICING.get(model, DEFAULT_PRICING)
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+def estimate_request(model: str, messages: List[Dict], max_tokens: int) -> Dict:
+    """Upper-bound cost of a request before it is sent"""
+    prompt_tokens = sum(count_tokens(m["content"], model) + MESSAGE_OVERHEAD_TOKENS for m in messages)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "max_completion_tokens": max_tokens,
+        "cost_usd": cost_usd(model, prompt_tokens, max_tokens)
+    }
+
+def _periods(now: Optional[datetime] = None) -> Dict[str, str]:
+    now = now or datetime.now()
+    return {"day": now.strftime("%Y-%m-%d"), "month": now.strftime("%Y-%m")}
+
+def _counter(period: str, dimension: str, value: str, metric: str) -> str:
+    return f"usage:{period}:{dimension}:{value}:{metric}"
+
+def _micros(usd: float) -> int:
+    return int(round(usd * 1_000_000))
+
+def record_usage(owner: str, session: str, task: str, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """Add one completed request to the ledger; returns its cost in USD"""
+    backend = get_backend()
+    cost = cost_usd(model, prompt_tokens, completion_tokens)
+    amounts = {
+        "requests": 1,
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "cost_micros": _micros(cost)
+    }
+    labels = {"owner": owner, "session": session, "task": task, "model": model}
+    periods = _periods()
+    month = periods["month"]
+    items = []
+    for dimension, value in labels.items():
+        # First sighting in a month registers the value so reports can enumerate it
+        items.append((f"usage:seen:{month}:{dimension}:{value}", 1, PERIOD_TTLS["month"]))
+    for name, period in periods.items():
+        for dimension, value in labels.items():
+            for metric, amount in amounts.items():
+                items.append((_counter(period, dimension, value, metric), amount, PERIOD_TTLS[name]))
+    results = backend.incr_many(items)
+    for dimension, seen in zip(labels, results):
+        if seen == 1:
+            backend.append(f"usage:index:{month}:{dimension}", labels[dimension])
+    if USAGE_LOG:
+        backend.append("usage:log", {"timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                                     **labels, "prompt_tokens": prompt_tokens,
+                                     "completion_tokens": completion_tokens, "cost_usd": cost})
+    return cost
+
+def get_spend(owner: str) -> Dict[str, float]:
+    """Spend in USD for the current day and month"""
+    backend = get_backend()
+    return {name: (backend.get(_counter(period, "owner", owner, "cost_micros")) or 0) / 1_000_000
+            for name, period in _periods().items()}
+
+def _budgets(owner: str, user: Optional[str]) -> List[Tuple[str, str, str, float]]:
+    """(counter id, period, label, limit) for every configured budget"""
+    budgets = [(owner, "day", "Daily", DAILY_BUDGET_USD), (owner, "month", "Monthly", MONTHLY_BUDGET_USD)]
+    if user and user != owner:
+        budgets += [(f"user:{user}", "day", "Your daily", USER_DAILY_BUDGET_USD),
+                    (f"user:{user}", "month", "Your monthly", USER_MONTHLY_BUDGET_USD)]
+    return [budget for budget in budgets if budget[3] > 0]
+
+def reserve_budget(owner: str, estimated_cost: float, user: Optional[str] = None) -> Tuple[Dict, Optional[str]]:
+    """Atomically reserve `estimated_cost` against every configured budget of
+    the key `owner` and, when it is a different user of that key, of `user`.
+    Raises BudgetExceeded (holding nothing) if any budget would be crossed;
+    otherwise returns the reservation for settle_budget() and a soft warning
+    once committed spend passes BUDGET_WARN_RATIO."""
+    backend = get_backend()
+    periods = _periods()
+    amount = _micros(estimated_cost)
+    reservation = {"amount": amount, "keys": []}
+    warning = None
+    for scope, name, label, budget in _budgets(owner, user):
+        key = f"budget:{periods[name]}:{scope}"
+        committed = backend.incr(key, amount, ttl=PERIOD_TTLS[name])
+        reservation["keys"].append((key, PERIOD_TTLS[name]))
+        if committed > _micros(budget):
+            settle_budget(reservation, 0.0)
+            spent = (committed - amount) / 1_000_000
+            raise BudgetExceeded(f"{label} budget of ${budget:.2f} reached (committed ${spent:.4f}).")
+        if committed >= _micros(budget * BUDGET_WARN_RATIO):
+            warning = f"{label} budget {committed / _micros(budget):.0%} used (${committed / 1_000_000:.4f} of ${budget:.2f})."
+    return reservation, warning
+
+def settle_budget(reservation: Dict, actual_cost: float):
+    """Replace a reservation with the actual cost (0 releases it)"""
+    delta = _micros(actual_cost) - reservation["amount"]
+    if delta and reservation["keys"]:
+        get_backend().incr_many([(key, delta, ttl) for key, ttl in reservation["keys"]])
+
+def usage_report(dimension: str = "owner", period: Optional[str] = None) -> List[Dict]:
+    """Aggregated usage per value of `dimension` for a day (YYYY-MM-DD) or
+    month (YYYY-MM); defaults to the current month"""
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension {dimension}; expected one of {', '.join(DIMENSIONS)}")
+    backend = get_backend()
+    period = period or _periods()["month"]
+    rows = []
+    # Values are indexed per month; a day report keeps those active that day
+    for value in backend.list_range(f"usage:index:{period[:7]}:{dimension}"):
+        row = {dimension: value}
+        for metric in METRICS:
+            row[metric] = backend.get(_counter(period, dimension, value, metric)) or 0
+        if not row["requests"]:
+            continue
+        row["cost_usd"] = row.pop("cost_micros") / 1_000_000
+        rows.append(row)
+    return sorted(rows, key=lambda r: r["cost_usd"], reverse=True)
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Print aggregated usage from the shared state backend")
+    parser.add_argument("--by", default="owner", choices=DIMENSIONS)
+    parser.add_argument("--period", help="YYYY-MM-DD or YYYY-MM (default: current month)")
+    args = parser.parse_args()
+    print(json.dumps(usage_report(args.by, args.period), indent=2))